@@ -0,0 +1,307 @@
+"""
+ARC DTWT hot path microbenchmarks.
+
+Runs without a Minecraft server: plugin methods are bound to a plain host object
+with a command-recording server stub, and every database / language file lives
+in a temporary working directory.
+
+Usage:
+    python benchmarks/bench_hot_paths.py                   # compare with baselines.json
+    python benchmarks/bench_hot_paths.py --save-baseline   # record new baselines, merged into baselines.json
+    python benchmarks/bench_hot_paths.py --allow-missing   # report benchmarks without a baseline instead of failing
+    python benchmarks/bench_hot_paths.py --sizes 1000,100000 --threshold 1.5
+    python benchmarks/bench_hot_paths.py --backend memory  # in-memory storage, own baseline keys
+    python benchmarks/bench_hot_paths.py --backend cached  # SQLite behind the player record cache
+
+Exit code is 1 when any benchmark is slower than baseline * threshold, or has no
+baseline entry at all (unless --allow-missing), so a lost or stale baseline file
+can't make the gate pass silently.
+
+Times are compared relative to a calibration loop timed in the same run, so the
+gate follows code changes rather than the speed of the machine. Baselines from a
+different Python version are only reported, never failed on.
+
+Requires the endstone package (pip install endstone), the plugin module imports it.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from endstone_arc_dtwt.arc_dtwt_plugin import ARCDTWTPlugin, MAIN_PATH
+from endstone_arc_dtwt.CachedStorage import CachedStorage
+from endstone_arc_dtwt.DatabaseManager import DatabaseManager
+from endstone_arc_dtwt.GameBoard import GameBoard
+from endstone_arc_dtwt.LanguageManager import LanguageManager
+from endstone_arc_dtwt.MemoryStorage import MemoryStorage
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+from endstone_arc_dtwt.RenderScheduler import RenderScheduler
+from endstone_arc_dtwt.SQLiteStorage import SQLiteStorage
+from endstone_arc_dtwt.StorageBackend import StorageBackend
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines.json'
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_THRESHOLD = 1.5
+
+
+class RecordingServer:
+    """Server stub that records dispatched commands instead of running them."""
+
+    def __init__(self):
+        self.command_sender = object()
+        self.commands = []
+
+    def dispatch_command(self, sender, command: str) -> bool:
+        self.commands.append(command)
+        return True
+
+    def broadcast_message(self, message: str):
+        pass
+
+
+class PrintLogger:
+    def info(self, message):
+        print(message)
+
+    warning = error = info
+
+
+def make_plugin_host(storage: StorageBackend):
+    """
+    Build an object carrying the plugin's methods without constructing the endstone Plugin base.
+    """
+    namespace = {k: v for k, v in vars(ARCDTWTPlugin).items() if not k.startswith('__')}
+    host = type('BenchPluginHost', (), namespace)()
+    host.server = RecordingServer()
+    host.logger = PrintLogger()
+    host.storage = storage
+    storage.init()
+    host.language_manager = LanguageManager('ZH-CN')
+    host.leaderboard_cache = None
+    host.leaderboard_generation = 0
+    host.current_facility = {
+        'screen_start': (0, 64, 0),
+        'screen_end': (3, 68, 0),
+        'trigger_pos': (5, 64, 0)
+    }
+    # Unbounded budget so every frame is dispatched in the measured call
+    host.render_scheduler = RenderScheduler(host.dispatch_fill, block_budget_per_tick=10 ** 9)
+    return host
+
+
+def make_storage(backend: str, name: str) -> StorageBackend:
+    if backend == 'memory':
+        return MemoryStorage()
+    # Maintenance is not part of the measured paths
+    storage = SQLiteStorage(DatabaseManager(str(Path(MAIN_PATH) / f'{name}.db')), archive_inactive_days=0)
+    if backend == 'cached':
+        return CachedStorage(storage)
+    return storage
+
+
+def fill_player_records(host, rows: int):
+    rng = random.Random(rows)
+    batch = []
+    for i in range(rows):
+        best = rng.uniform(5.0, 60.0)
+        batch.append(PlayerRecord(f'xuid{i}', f'player{i}', best, '2024-01-01', best))
+        if len(batch) == 10_000:
+            host.storage.import_player_records(batch)
+            batch.clear()
+    if batch:
+        host.storage.import_player_records(batch)
+
+
+def measure(func, number: int, repeat: int = 7) -> float:
+    """Return the best seconds per call over `repeat` rounds of `number` calls, min is the least noisy."""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return min(rounds)
+
+
+def run_database_benchmarks(sizes, backend: str, results: dict):
+    suffix = '' if backend == 'sqlite' else f'@{backend}'
+    for rows in sizes:
+        host = make_plugin_host(make_storage(backend, f'bench_{rows}'))
+        fill_player_records(host, rows)
+        rng = random.Random(0)
+        # Larger tables get fewer iterations, rank query is a full window scan
+        number = max(3, 20_000 // max(1, rows // 100))
+
+        results[f'get_player_rank[{rows}]{suffix}'] = measure(
+            lambda: host.get_player_rank(f'xuid{rng.randrange(rows)}'), number)
+
+        def cold_leaderboard():
+            host.leaderboard_cache = None
+            host.get_leaderboard(3)
+        results[f'get_leaderboard[{rows}]{suffix}'] = measure(cold_leaderboard, number)
+
+        counter = iter(range(rows, rows * 10))
+        results[f'update_player_record[{rows}]{suffix}'] = measure(
+            lambda: host.update_player_record(f'xuid{rng.randrange(rows * 2) if rng.random() < 0.5 else next(counter)}',
+                                              'bench', rng.uniform(5.0, 60.0)), 200)
+
+        # Record lookups of one finished game, the player is online so a cache would hold the record
+        online = [f'xuid{rng.randrange(rows)}' for _ in range(16)]
+        for xuid in online:
+            host.storage.prefetch_player(xuid)
+
+        def game_end_records():
+            xuid = online[rng.randrange(len(online))]
+            host.can_receive_daily_reward(xuid)
+            host.update_player_record(xuid, 'bench', rng.uniform(5.0, 60.0))
+            host.get_player_best_time(xuid)
+        results[f'game_end_records[{rows}]{suffix}'] = measure(game_end_records, 200)
+
+        host.storage.close()
+        print(f'[ARC DTWT Bench]{backend} storage benchmarks with {rows} rows done.')
+
+
+def run_cpu_benchmarks(results: dict):
+    host = make_plugin_host(MemoryStorage())
+    rng = random.Random(0)
+
+    positions = [(rng.randint(-1, 4), rng.randint(63, 69), 0) for _ in range(1024)]
+    index = iter(range(10 ** 9))
+    results['convert_world_pos_to_screen_pos'] = measure(
+        lambda: host.convert_world_pos_to_screen_pos(positions[next(index) & 1023]), 20_000)
+
+    # One tap on the classic 4x5 screen and on a 6x10 event screen, cost should follow changed tiles only
+    for width, height in ((4, 5), (6, 10)):
+        host.current_facility = {
+            'screen_start': (0, 64, 0),
+            'screen_end': (width - 1, 64 + height - 1, 0),
+            'trigger_pos': (width + 1, 64, 0)
+        }
+        host.board = GameBoard(width, height)
+        host.board.reset([rng.randrange(width) for _ in range(height)])
+        host.displayer_game_update()
+
+        def game_update():
+            host.board.advance(rng.randrange(host.board.width))
+            host.displayer_game_update()
+            host.server.commands.clear()
+        name = 'displayer_game_update' if (width, height) == (4, 5) else f'displayer_game_update[{width}x{height}]'
+        results[name] = measure(game_update, 5_000)
+
+    keys = list(LanguageManager.ZH_CN_CONTENT.keys())
+    results['LanguageManager.GetText'] = measure(
+        lambda: host.language_manager.GetText(keys[next(index) % len(keys)]), 50_000)
+
+    print('[ARC DTWT Bench]cpu benchmarks done.')
+
+
+def calibration_loop():
+    """Fixed pure Python work, dict lookups, attribute access, calls and formatting like the measured paths."""
+    table = {i: str(i) for i in range(64)}
+    total = 0
+    for i in range(256):
+        total += len(table[i & 63]) + len(f'{i},{total}')
+    return total
+
+
+def run_calibration() -> float:
+    """Seconds per calibration loop on this machine, measured like the benchmarks."""
+    return measure(calibration_loop, 2_000)
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float, calibration: float) -> tuple:
+    """
+    Return (regressed names, names without a baseline entry).
+    Baseline entries are in calibration loops, shown in microseconds of this machine.
+    """
+    regressions = []
+    missing = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f'  {name:<40} {seconds * 1e6:>12.2f} us  (no baseline)')
+            missing.append(name)
+            continue
+        base *= calibration
+        ratio = seconds / base if base > 0 else 1.0
+        flag = 'REGRESSION' if ratio > threshold else 'ok'
+        print(f'  {name:<40} {seconds * 1e6:>12.2f} us  baseline {base * 1e6:>10.2f} us  x{ratio:.2f}  {flag}')
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions, missing
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='ARC DTWT hot path microbenchmarks')
+    parser.add_argument('--sizes', default=','.join(str(_) for _ in DEFAULT_SIZES),
+                        help='comma separated player_records row counts')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fail when time exceeds baseline * threshold')
+    parser.add_argument('--backend', choices=('sqlite', 'memory', 'cached'), default='sqlite', help='storage backend to measure')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='merge results into the baseline file')
+    parser.add_argument('--allow-missing', action='store_true', help='do not fail on benchmarks without a baseline entry')
+    args = parser.parse_args()
+    sizes = [int(_) for _ in args.sizes.split(',') if _]
+    baseline_path = Path(args.baseline).resolve()
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            # Calibrate before and after, the faster one is the least disturbed
+            calibration = run_calibration()
+            run_cpu_benchmarks(results)
+            run_database_benchmarks(sizes, args.backend, results)
+            calibration = min(calibration, run_calibration())
+        finally:
+            os.chdir(cwd)
+    print(f'[ARC DTWT Bench]calibration loop {calibration * 1e6:.2f} us.')
+
+    saved = {}
+    if baseline_path.exists():
+        saved = json.loads(baseline_path.read_text(encoding='utf-8'))
+    # Files from before calibration hold absolute times of an unknown machine
+    baseline = saved.get('results', {}) if 'calibration' in saved else {}
+    python_version = '.'.join(platform.python_version_tuple()[:2])
+
+    if args.save_baseline:
+        if saved.get('python') != python_version:
+            # Relative speeds change between interpreters, don't mix them in one file
+            baseline = {}
+        # Other backends and sizes keep their entries, one file covers every configuration
+        baseline.update({name: seconds / calibration for name, seconds in results.items()})
+        baseline_path.write_text(json.dumps({
+            'python': python_version,
+            'machine': platform.machine(),
+            'calibration': 'results are multiples of calibration_loop() timed in the same run',
+            'results': baseline
+        }, indent=2, sort_keys=True), encoding='utf-8')
+        print(f'[ARC DTWT Bench]baseline saved to {baseline_path}')
+        return 0
+
+    regressions, missing = compare_with_baseline(results, baseline, args.threshold, calibration)
+    if baseline and saved.get('python') != python_version:
+        print(f'[ARC DTWT Bench]baseline recorded with Python {saved.get("python")}, running {python_version}: '
+              f'report only. Record a baseline for this interpreter with --save-baseline.')
+        return 0
+    failed = False
+    if regressions:
+        print(f'[ARC DTWT Bench]{len(regressions)} benchmark(s) regressed past x{args.threshold}: {", ".join(regressions)}')
+        failed = True
+    if missing and not args.allow_missing:
+        print(f'[ARC DTWT Bench]{len(missing)} benchmark(s) have no baseline in {baseline_path}: {", ".join(missing)}. '
+              f'Record them with --save-baseline or pass --allow-missing.')
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+from endstone_arc_dtwt.RunStatistics import RunStatistics
+from endstone_arc_dtwt.StorageBackend import StorageBackend
+
+# Marks a player known to have no record, so new players are not looked up again
+_MISSING = object()
+
+
+class CachedStorage(StorageBackend):
+    """
+    玩家记录的写穿LRU缓存，包装任意 StorageBackend
+    在线玩家的记录在进服时预读，离开时丢弃；成绩在缓存中合并后整行写回后端，
+    因此一局结束最多读一次数据库。缓存内容只在 invalidate 中失效
+    缓存中的 PlayerRecord 对调用方只读，不要直接修改
+    每次写入或失效都会推进该玩家的写入代数，其他线程未命中时读到的旧行只在代数未变时放入缓存
+    """
+
+    def __init__(self, backend: StorageBackend, max_size: int = 256):
+        """
+        :param backend: 被包装的存储后端
+        :param max_size: 最多缓存的玩家数量
+        """
+        self.backend = backend
+        self.max_size = max(1, max_size)
+        self.lock = threading.Lock()
+        self.records: OrderedDict[str, Any] = OrderedDict()
+        self.write_generation = 0
+        self.generations: Dict[str, int] = {}  # xuid -> write_generation of its last write
+        self.clear_generation = 0  # write_generation of the last full invalidation
+
+    def init(self) -> None:
+        self.backend.init()
+
+    def close(self) -> None:
+        self.backend.close()
+
+    # Facility
+    def save_facility(self, screen_start: tuple, screen_end: tuple, trigger_pos: tuple) -> bool:
+        return self.backend.save_facility(screen_start, screen_end, trigger_pos)
+
+    def load_facility(self) -> Optional[Dict[str, Any]]:
+        return self.backend.load_facility()
+
+    # Player record
+    def get_player_record(self, xuid: str) -> Optional[PlayerRecord]:
+        with self.lock:
+            record = self.records.get(xuid)
+            if record is not None:
+                self.records.move_to_end(xuid)
+                return None if record is _MISSING else record
+            generation = self._get_generation(xuid)
+        record = self.backend.get_player_record(xuid)
+        self._put(xuid, record, generation)
+        return record
+
+    def update_player_record(self, xuid: str, player_name: str, time: float, raw_time: float,
+                             play_date: str) -> Tuple[bool, bool]:
+        existing_record = self.get_player_record(xuid)
+        run = PlayerRecord(xuid, player_name, time, play_date, raw_time)
+        if existing_record is None:
+            record = run
+            is_new_record = True
+        else:
+            is_new_record = time < existing_record.best_record
+            record = PlayerRecord(
+                xuid,
+                player_name,
+                time if is_new_record else existing_record.best_record,
+                play_date,
+                raw_time if is_new_record else existing_record.best_raw_record
+            )
+        success = self.backend.save_player_record(record, run)
+        if success:
+            self._put(xuid, record)
+        else:
+            self.invalidate(xuid)
+        return success, is_new_record
+
+    def save_player_record(self, record: PlayerRecord, run: Optional[PlayerRecord] = None) -> bool:
+        success = self.backend.save_player_record(record, run)
+        if success:
+            self._put(record.xuid, PlayerRecord(*record.to_row()))
+        else:
+            self.invalidate(record.xuid)
+        return success
+
+    def get_player_rank(self, xuid: str) -> Optional[int]:
+        return self.backend.get_player_rank(xuid)
+
+    def get_leaderboard(self, limit: int, reverse: bool = False) -> List[Tuple[str, float]]:
+        return self.backend.get_leaderboard(limit, reverse)
+
+    def get_average_time(self) -> Optional[float]:
+        return self.backend.get_average_time()
+
+    def import_player_records(self, records: Iterable[PlayerRecord]) -> bool:
+        result = self.backend.import_player_records(records)
+        self.invalidate()
+        return result
+
+    # Season
+    def get_current_season(self) -> Optional[int]:
+        return self.backend.get_current_season()
+
+    def close_season(self, rewards: Sequence[int], today: str) -> Optional[int]:
+        season_id = self.backend.close_season(rewards, today)
+        if season_id is not None:
+            # Every cached record belonged to the season that just ended
+            self.invalidate()
+        return season_id
+
+    def get_season_leaderboard(self, season_id: int, limit: int) -> List[Tuple[str, float]]:
+        return self.backend.get_season_leaderboard(season_id, limit)
+
+    def get_season_rewards(self, xuid: str) -> List[Tuple[int, int, int, int]]:
+        return self.backend.get_season_rewards(xuid)
+
+    def complete_season_reward(self, reward_id: int) -> bool:
+        return self.backend.complete_season_reward(reward_id)
+
+    def get_alltime_record(self, xuid: str) -> Optional[PlayerRecord]:
+        return self.backend.get_alltime_record(xuid)
+
+    def get_alltime_rank(self, xuid: str) -> Optional[int]:
+        return self.backend.get_alltime_rank(xuid)
+
+    def get_alltime_leaderboard(self, limit: int) -> List[Tuple[str, float]]:
+        return self.backend.get_alltime_leaderboard(limit)
+
+    # Statistics
+    def load_run_statistics(self, keys: Sequence[str]) -> Dict[str, RunStatistics]:
+        return self.backend.load_run_statistics(keys)
+
+    def merge_run_statistics(self, deltas: Dict[str, RunStatistics]) -> Dict[str, RunStatistics]:
+        return self.backend.merge_run_statistics(deltas)
+
+    # Reward
+    def get_last_play_date(self, xuid: str) -> Optional[str]:
+        record = self.get_player_record(xuid)
+        # Without a record this season the date lives in the all-time record
+        return record.last_play_date if record is not None else self.backend.get_last_play_date(xuid)
+
+    # Cache
+    def prefetch_player(self, xuid: str) -> None:
+        self.get_player_record(xuid)
+
+    def evict_player(self, xuid: str) -> None:
+        self.invalidate(xuid)
+
+    def invalidate(self, xuid: Optional[str] = None) -> None:
+        """
+        使缓存失效，所有失效都经过这里
+        :param xuid: 玩家XUID，为None时清空全部缓存
+        """
+        with self.lock:
+            self.write_generation += 1
+            if xuid is None:
+                self.records.clear()
+                self.generations.clear()
+                self.clear_generation = self.write_generation
+            else:
+                self.records.pop(xuid, None)
+                self.generations[xuid] = self.write_generation
+
+    # Maintenance
+    def restore_player(self, xuid: str) -> bool:
+        with self.lock:
+            record = self.records.get(xuid)
+        if record is not None and record is not _MISSING:
+            # A live record means nothing of this player is archived
+            return False
+        restored = self.backend.restore_player(xuid)
+        if restored:
+            self.invalidate(xuid)
+        return restored
+
+    def run_maintenance_slice(self) -> int:
+        archived = self.backend.run_maintenance_slice()
+        if archived > 0:
+            # Archived rows left the table, cached copies would resurrect them on the next write
+            self.invalidate()
+        return archived
+
+    def _get_generation(self, xuid: str) -> int:
+        # Callers hold self.lock
+        return max(self.generations.get(xuid, 0), self.clear_generation)
+
+    def _put(self, xuid: str, record: Optional[PlayerRecord], read_generation: Optional[int] = None):
+        """
+        :param record: 要缓存的记录，None 表示玩家没有记录
+        :param read_generation: 未命中时读取前的写入代数，为None表示这是一次写入
+        """
+        with self.lock:
+            if read_generation is None:
+                self.write_generation += 1
+                self.generations[xuid] = self.write_generation
+            elif self._get_generation(xuid) != read_generation:
+                # Written or invalidated while the backend was read, the row read is older than the cache
+                return
+            self.records[xuid] = _MISSING if record is None else record
+            self.records.move_to_end(xuid)
+            while len(self.records) > self.max_size:
+                self.records.popitem(last=False)
@@ -1,5 +1,5 @@
 import sqlite3
-from typing import Any, List, Dict, Optional, Union
+from typing import Any, List, Dict, Optional, Union, Iterable, Iterator, Sequence, Tuple, Type
 import threading
 from pathlib import Path
 
@@ -12,6 +12,7 @@ class DatabaseManager:
         """
         self.db_path = db_path
         self._local = threading.local()  # 线程本地存储
+        self._sql_cache: Dict[tuple, str] = {}  # 按表名与字段集合缓存的SQL
         self._ensure_db_exists()
 
     def _ensure_db_exists(self):
@@ -90,9 +91,7 @@ class DatabaseManager:
         :param data: 要插入的数据字典
         :return: 是否插入成功
         """
-        fields = ','.join(data.keys())
-        placeholders = ','.join(['?' for _ in data])
-        sql = f"INSERT INTO {table} ({fields}) VALUES ({placeholders})"
+        sql = self._get_insert_sql(table, tuple(data.keys()))
         return self.execute(sql, tuple(data.values()))
 
     def update(self, table: str, data: Dict[str, Any], where: str, params: tuple = ()) -> bool:
@@ -104,8 +103,7 @@ class DatabaseManager:
         :param params: WHERE子句的参数
         :return: 是否更新成功
         """
-        set_clause = ','.join([f"{k}=?" for k in data.keys()])
-        sql = f"UPDATE {table} SET {set_clause} WHERE {where}"
+        sql = self._get_update_sql(table, tuple(data.keys()), where)
         return self.execute(sql, tuple(data.values()) + params)
 
     def delete(self, table: str, where: str, params: tuple = ()) -> bool:
@@ -126,9 +124,18 @@ class DatabaseManager:
         :param fields: 字段定义字典，key为字段名，value为字段类型定义
         :return: 是否创建成功
         """
+        return self.execute(self.get_create_table_sql(table, fields))
+
+    @staticmethod
+    def get_create_table_sql(table: str, fields: Dict[str, str]) -> str:
+        """
+        生成建表语句，供 execute_batch 在事务中建表
+        :param table: 表名
+        :param fields: 字段定义字典
+        :return: SQL语句
+        """
         field_defs = ','.join([f"{k} {v}" for k, v in fields.items()])
-        sql = f"CREATE TABLE IF NOT EXISTS {table} ({field_defs})"
-        return self.execute(sql)
+        return f"CREATE TABLE IF NOT EXISTS {table} ({field_defs})"
 
     def table_exists(self, table: str) -> bool:
         """
@@ -137,4 +144,194 @@ class DatabaseManager:
         :return: 表是否存在
         """
         sql = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
-        return self.query_one(sql, (table,)) is not None
\ No newline at end of file
+        return self.query_one(sql, (table,)) is not None
+
+    def execute_batch(self, statements: Sequence[Tuple[str, tuple]]) -> bool:
+        """
+        在同一事务中执行多条SQL语句
+        :param statements: [(SQL语句, SQL参数)]
+        :return: 是否全部执行成功，失败时整体回滚
+        """
+        try:
+            cursor = self.connection.cursor()
+            if not self.connection.in_transaction:
+                # sqlite3 only opens transactions for DML, begin explicitly so DDL is rolled back too
+                cursor.execute("BEGIN")
+            for sql, params in statements:
+                cursor.execute(sql, params)
+            self.connection.commit()
+            return True
+        except Exception as e:
+            print(f"Execute batch SQL error: {str(e)}")
+            self.connection.rollback()
+            return False
+
+    def create_index(self, index: str, table: str, columns: Sequence[str]) -> bool:
+        """
+        创建索引
+        :param index: 索引名
+        :param table: 表名
+        :param columns: 字段名列表
+        :return: 是否创建成功
+        """
+        return self.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({','.join(columns)})")
+
+    def column_exists(self, table: str, column: str) -> bool:
+        """
+        检查字段是否存在
+        :param table: 表名
+        :param column: 字段名
+        :return: 字段是否存在
+        """
+        return any(row["name"] == column for row in self.query_all(f"PRAGMA table_info({table})"))
+
+    def ensure_column(self, table: str, column: str, definition: str) -> bool:
+        """
+        字段不存在时添加字段，用于旧数据库升级
+        :param table: 表名
+        :param column: 字段名
+        :param definition: 字段类型定义
+        :return: 是否成功
+        """
+        if self.column_exists(table, column):
+            return True
+        return self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    # Low allocation API
+    def query_one_tuple(self, sql: str, params: tuple = (), record_type: Optional[Type] = None) -> Optional[Any]:
+        """
+        查询单条记录，不转换为字典
+        :param sql: SQL语句
+        :param params: SQL参数
+        :param record_type: 记录类，按列顺序构造；为None时返回元组
+        :return: 元组、记录对象或None
+        """
+        try:
+            cursor = self._get_tuple_cursor(record_type)
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        except Exception as e:
+            print(f"Query one tuple error: {str(e)}")
+            return None
+
+    def query_all_tuple(self, sql: str, params: tuple = (), record_type: Optional[Type] = None) -> List[Any]:
+        """
+        查询多条记录，不转换为字典
+        :param sql: SQL语句
+        :param params: SQL参数
+        :param record_type: 记录类，按列顺序构造；为None时返回元组
+        :return: 元组或记录对象列表
+        """
+        try:
+            cursor = self._get_tuple_cursor(record_type)
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"Query all tuple error: {str(e)}")
+            return []
+
+    def iter_query(self, sql: str, params: tuple = (), record_type: Optional[Type] = None,
+                   batch_size: int = 256) -> Iterator[Any]:
+        """
+        流式查询，分批读取结果而不一次性载入内存
+        :param sql: SQL语句
+        :param params: SQL参数
+        :param record_type: 记录类，按列顺序构造；为None时返回元组
+        :param batch_size: 每批读取的行数
+        :return: 逐行产出的生成器
+        """
+        try:
+            cursor = self._get_tuple_cursor(record_type)
+            cursor.execute(sql, params)
+        except Exception as e:
+            print(f"Iter query error: {str(e)}")
+            return
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def insert_many(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> bool:
+        """
+        批量插入数据，在同一事务中执行
+        :param table: 表名
+        :param columns: 字段名列表
+        :param rows: 与字段顺序一致的数据行
+        :return: 是否插入成功
+        """
+        sql = self._get_insert_sql(table, tuple(columns))
+        return self.execute_many(sql, rows)
+
+    def upsert_many(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                    conflict_columns: Sequence[str]) -> bool:
+        """
+        批量插入或更新数据，冲突时更新非冲突字段
+        :param table: 表名
+        :param columns: 字段名列表
+        :param rows: 与字段顺序一致的数据行
+        :param conflict_columns: 冲突判断字段（主键或唯一索引）
+        :return: 是否执行成功
+        """
+        sql = self._get_upsert_sql(table, tuple(columns), tuple(conflict_columns))
+        return self.execute_many(sql, rows)
+
+    def execute_many(self, sql: str, rows: Iterable[Sequence[Any]]) -> bool:
+        """
+        批量执行SQL语句
+        :param sql: SQL语句
+        :param rows: 参数序列
+        :return: 是否执行成功
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.executemany(sql, rows)
+            self.connection.commit()
+            return True
+        except Exception as e:
+            print(f"Execute many SQL error: {str(e)}")
+            self.connection.rollback()
+            return False
+
+    def _get_tuple_cursor(self, record_type: Optional[Type]) -> sqlite3.Cursor:
+        """获取不使用sqlite3.Row的游标"""
+        cursor = self.connection.cursor()
+        if record_type is None:
+            cursor.row_factory = None
+        else:
+            cursor.row_factory = lambda _, row: record_type(*row)
+        return cursor
+
+    def _get_insert_sql(self, table: str, columns: Tuple[str, ...]) -> str:
+        key = ('insert', table, columns)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            sql = f"INSERT INTO {table} ({','.join(columns)}) VALUES ({','.join('?' * len(columns))})"
+            self._sql_cache[key] = sql
+        return sql
+
+    def _get_update_sql(self, table: str, columns: Tuple[str, ...], where: str) -> str:
+        key = ('update', table, columns, where)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            set_clause = ','.join([f"{k}=?" for k in columns])
+            sql = f"UPDATE {table} SET {set_clause} WHERE {where}"
+            self._sql_cache[key] = sql
+        return sql
+
+    def _get_upsert_sql(self, table: str, columns: Tuple[str, ...], conflict_columns: Tuple[str, ...]) -> str:
+        key = ('upsert', table, columns, conflict_columns)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            update_columns = [k for k in columns if k not in conflict_columns]
+            if update_columns:
+                action = "DO UPDATE SET " + ','.join([f"{k}=excluded.{k}" for k in update_columns])
+            else:
+                action = "DO NOTHING"
+            sql = (f"INSERT INTO {table} ({','.join(columns)}) VALUES ({','.join('?' * len(columns))}) "
+                   f"ON CONFLICT ({','.join(conflict_columns)}) {action}")
+            self._sql_cache[key] = sql
+        return sql
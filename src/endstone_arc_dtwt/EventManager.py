@@ -0,0 +1,91 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Events other plugins can subscribe to
+EVENT_GAME_STARTED = 'game_started'
+EVENT_GAME_ENDED = 'game_ended'
+EVENT_PERSONAL_BEST = 'personal_best'
+EVENT_TOP_CHANGED = 'top_changed'
+EVENTS = (EVENT_GAME_STARTED, EVENT_GAME_ENDED, EVENT_PERSONAL_BEST, EVENT_TOP_CHANGED)
+
+
+class EventManager:
+    """
+    对外事件分发
+    游戏中产生的事件先在当前tick内缓存，tick结束时按事件类型打包交给后台线程投递，
+    订阅者再慢也不会拖慢游戏；订阅者在后台线程中被调用，需要操作世界时应通过服务器调度器回到主线程
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[str, Tuple[Callable[[List[Dict[str, Any]]], None], ...]] = {event: () for event in EVENTS}
+        self.pending: List[Tuple[str, Dict[str, Any]]] = []
+        self.delivery_queue: queue.Queue = queue.Queue()
+        self.worker: Optional[threading.Thread] = None
+
+    def subscribe(self, event: str, callback: Callable[[List[Dict[str, Any]]], None]) -> bool:
+        """
+        订阅事件
+        :param event: 事件名，见 EVENTS
+        :param callback: 回调函数，参数为本tick内该事件的负载列表
+        :return: 是否订阅成功
+        """
+        if event not in self.subscribers or not callable(callback):
+            return False
+        if callback not in self.subscribers[event]:
+            # Copy on write, the delivery thread iterates the old tuple safely
+            self.subscribers[event] = self.subscribers[event] + (callback,)
+        self._ensure_worker()
+        return True
+
+    def unsubscribe(self, event: str, callback: Callable[[List[Dict[str, Any]]], None]) -> bool:
+        """
+        取消订阅
+        :param event: 事件名
+        :param callback: 订阅时传入的回调函数
+        :return: 是否取消成功
+        """
+        if event not in self.subscribers or callback not in self.subscribers[event]:
+            return False
+        self.subscribers[event] = tuple(_ for _ in self.subscribers[event] if _ != callback)
+        return True
+
+    def emit(self, event: str, payload: Dict[str, Any]):
+        """记录一个事件，没有订阅者时直接丢弃"""
+        if self.subscribers.get(event):
+            self.pending.append((event, payload))
+
+    def flush(self):
+        """tick结束时调用，把本tick的事件打包交给投递线程"""
+        if not self.pending:
+            return
+        batch: Dict[str, List[Dict[str, Any]]] = {}
+        for event, payload in self.pending:
+            batch.setdefault(event, []).append(payload)
+        self.pending = []
+        self.delivery_queue.put(batch)
+
+    def close(self):
+        """停止投递线程，未投递的事件被丢弃"""
+        self.pending = []
+        if self.worker is not None:
+            self.delivery_queue.put(None)
+            self.delivery_queue = queue.Queue()
+            self.worker = None
+
+    def _ensure_worker(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._deliver_loop, args=(self.delivery_queue,), name='ARCDTWT-Events', daemon=True)
+            self.worker.start()
+
+    def _deliver_loop(self, delivery_queue: queue.Queue):
+        while True:
+            batch = delivery_queue.get()
+            if batch is None:
+                return
+            for event, payloads in batch.items():
+                for callback in self.subscribers.get(event, ()):
+                    try:
+                        callback(payloads)
+                    except Exception as e:
+                        print(f'[ARC DTWT]Event subscriber {getattr(callback, "__qualname__", callback)} failed on {event}: {e}')
@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Smallest playable board: a choice of columns and one row of look-ahead
+BOARD_MIN_WIDTH = 2
+BOARD_MIN_HEIGHT = 2
+
+
+class GameBoard:
+    """
+    游戏盘面
+    每行记录黑块所在列（None 表示终点行，整行为绿色），行存放在环形缓冲区中，
+    消除最底行只移动头指针；每次变化只记录真正改变颜色的方块，渲染开销与变化的方块数成正比，与盘面大小无关
+    """
+
+    def __init__(self, width: int, height: int):
+        """
+        :param width: 列数
+        :param height: 行数
+        """
+        self.width = width
+        self.height = height
+        self.rows: List[Optional[int]] = [None] * height
+        self.head = 0  # rows 中最底行的位置
+        self.changes: Dict[Tuple[int, int], str] = {}  # (行, 列) -> 颜色，行从下往上数
+
+    def row(self, row: int) -> Optional[int]:
+        """
+        :param row: 屏幕行号，0为最底行
+        :return: 该行黑块所在列，终点行为None
+        """
+        return self.rows[(self.head + row) % self.height]
+
+    def bottom(self) -> Optional[int]:
+        """玩家需要点击的最底行黑块所在列"""
+        return self.rows[self.head]
+
+    def reset(self, columns: Sequence[Optional[int]]):
+        """
+        重新填充整个盘面，每个方块都会重绘
+        :param columns: 自下而上每行的黑块列，长度为 height
+        """
+        self.head = 0
+        self.rows = list(columns)
+        self.changes.clear()
+        for row, column in enumerate(self.rows):
+            self._paint_row(row, column)
+
+    def advance(self, new_top: Optional[int]):
+        """
+        消除最底行，其余各行下移一行，顶部加入新行
+        :param new_top: 新顶行的黑块列，None 为终点行
+        """
+        height = self.height
+        # Row r shows what row r + 1 showed before, compare before the buffer slot is reused
+        for row in range(height - 1):
+            self._mark_row_change(row, self.rows[(self.head + row) % height], self.rows[(self.head + row + 1) % height])
+        self._mark_row_change(height - 1, self.rows[(self.head + height - 1) % height], new_top)
+        # The old bottom slot becomes the new top row
+        self.rows[self.head] = new_top
+        self.head = (self.head + 1) % height
+
+    def drain_changes(self) -> List[Tuple[int, int, int, str]]:
+        """
+        取出并清空待绘制的变化，同一行内相邻的同色方块合并为一段
+        :return: [(行, 起始列, 结束列, 颜色)]
+        """
+        runs: List[Tuple[int, int, int, str]] = []
+        for (row, column) in sorted(self.changes):
+            color = self.changes[(row, column)]
+            if runs and runs[-1][0] == row and runs[-1][2] == column - 1 and runs[-1][3] == color:
+                runs[-1] = (row, runs[-1][1], column, color)
+            else:
+                runs.append((row, column, column, color))
+        self.changes.clear()
+        return runs
+
+    def _mark_row_change(self, row: int, before: Optional[int], after: Optional[int]):
+        if before == after:
+            return
+        if before is None or after is None:
+            # To or from a finish row every tile of the row changes color
+            self._paint_row(row, after)
+            return
+        self.changes[(row, before)] = 'white'
+        self.changes[(row, after)] = 'black'
+
+    def _paint_row(self, row: int, column: Optional[int]):
+        for c in range(self.width):
+            if column is None:
+                self.changes[(row, c)] = 'green'
+            else:
+                self.changes[(row, c)] = 'black' if c == column else 'white'
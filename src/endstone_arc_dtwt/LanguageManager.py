@@ -17,8 +17,8 @@ class LanguageManager:
         'DTWT_CREATE_DISPLAYER_START_BLOCK_SET_MESSAGE': '[弧光·别踩白块]启动方块配置成功，坐标：{0}',
         'DTWT_CREATE_HINT4': '[弧光·别踩白块]别踩方块小游戏配置完毕！打碎启动方块即可开始游戏~',
         'DTWT_CREATE_COMPLETED_BROADCAST': '[弧光·别踩白块]别踩白块小游戏配置完毕，快来主世界维度{0}坐标位置参与挑战吧~',
-        'DTWT_CREATE_WRONG_DISPLAYER_WIDTH_MESSAGE': '[弧光·别踩白块]你选择的显示屏宽度不为4，仅支持4x5尺寸的显示屏！',
-        'DTWT_CREATE_WRONG_DISPLAYER_HEIGHT_MESSAGE': '[弧光·别踩白块]你选择的显示屏高度不为5，仅支持4x5尺寸的显示屏！',
+        'DTWT_CREATE_WRONG_DISPLAYER_WIDTH_MESSAGE': '[弧光·别踩白块]你选择的显示屏宽度不在{0}~{1}之间！',
+        'DTWT_CREATE_WRONG_DISPLAYER_HEIGHT_MESSAGE': '[弧光·别踩白块]你选择的显示屏高度不在{0}~{1}之间，终点方块需要在起点方块上方！',
         'DTWT_CREATE_DISPLAYER_NOT_A_PLANE_ERROR_MESSAGE': '[弧光·别踩白块]显示屏需要是一个竖着的平面！',
         'DTWT_CREATE_WRONG_DIMENSION_MESSAGE': '[弧光·别踩白块]游戏设置只支持布置在主世界维度，暂不支持{0}维度',
         'DTWT_GAME_START_BROADCAST': '[弧光·别踩白块]玩家{0}正在游玩别踩白块小游戏~快来围观呀~',
@@ -31,7 +31,18 @@ class LanguageManager:
         'DTWT_GAME_TIMEOUT_MESSAGE': '[弧光·别踩白块]游戏超时！时间限制为30秒，挑战失败！',
         'DTWT_DAILY_REWARD_MESSAGE': '[弧光·别踩白块]恭喜获得每日首次完成奖励：{0}元！',
         'DTWT_RANK_REWARD_MESSAGE': '[弧光·别踩白块]恭喜你突破了第{0}名的排行记录，获得了奖金{1}元！',
-        'DTWT_ECONOMY_NOT_AVAILABLE': '[弧光·别踩白块]经济系统不可用，无法发放奖金。'
+        'DTWT_ECONOMY_NOT_AVAILABLE': '[弧光·别踩白块]经济系统不可用，无法发放奖金。',
+        'DTWT_LEADERBOARD_TITLE': '别踩白块排行榜',
+        'DTWT_CURRENT_SEASON_MESSAGE': '[弧光·别踩白块]以上为第{0}赛季排名，输入 /dtwt alltime 查看历代排行榜',
+        'DTWT_ALLTIME_DESCRIPTION': '[弧光·别踩白块]历代排行榜：\\n1.{0}\\n2.{1}\\n3.{2}\\n你的历代最佳纪录：\\n用时：{3}\\n排名：{4}',
+        'DTWT_SEASON_LEADERBOARD': '[弧光·别踩白块]第{0}赛季排行榜：\\n{1}',
+        'DTWT_SEASON_CLOSED_BROADCAST': '[弧光·别踩白块]第{0}赛季结束了！本赛季冠军是{1}，第{2}赛季现在开始~',
+        'DTWT_SEASON_REWARD_MESSAGE': '[弧光·别踩白块]恭喜你在第{0}赛季获得第{1}名，获得了奖金{2}元！',
+        'DTWT_STATISTICS_TODAY': '今日',
+        'DTWT_STATISTICS_SEASON': '本赛季',
+        'DTWT_STATISTICS_ALL': '累计',
+        'DTWT_STATISTICS_LINE': '[弧光·别踩白块]{0}：通关{1}次，失败{2}次，超时{3}次，用时中位数{4}秒，P90 {5}秒，P99 {6}秒',
+        'DTWT_STATISTICS_PLAYER_POSITION': '[弧光·别踩白块]你的本赛季最佳纪录快于本赛季{0}%的通关记录'
     }
 
     def __init__(self, default_language_code):
@@ -93,4 +104,11 @@ class LanguageManager:
             print(f'[ARC Core]Key {key} not found in language file {target_lang}.txt.')
             return ''
         else:
-            return LanguageManager.language_dict[target_lang][key]
\ No newline at end of file
+            return LanguageManager.language_dict[target_lang][key]
+
+    def PreloadAll(self):
+        # Load every language file in config folder so GetText never hits the disk for them
+        for language_file_path in Path(MAIN_PATH).glob("*.txt"):
+            language_code = language_file_path.stem.upper()
+            if language_code not in LanguageManager.language_dict:
+                LanguageManager(language_code)
@@ -0,0 +1,88 @@
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+OBJECTIVE_NAME = 'dtwt_top'
+
+
+class LeaderboardDisplay:
+    """
+    侧边栏排行榜
+    每行是记分板上的一个虚拟玩家名，分数为行号；只有排行榜前N名真正变化时才重绘，
+    且只重绘内容改变的行
+    侧边栏是全服唯一的显示位，开启后会覆盖其他插件的侧边栏，因此默认关闭
+    """
+
+    def __init__(self, dispatch_command: Callable[[str], None], size: int = 0, recent_num: int = 3):
+        """
+        :param dispatch_command: 以控制台身份执行命令的函数
+        :param size: 显示前几名，0为关闭
+        :param recent_num: 显示最近几位打破前N名记录的玩家
+        """
+        self.dispatch_command = dispatch_command
+        self.size = size
+        self.recent_num = recent_num
+        self.top_entries: List[Tuple[str, float]] = []
+        self.recent_breakers: deque = deque(maxlen=max(recent_num, 1))
+        self.lines: List[Optional[str]] = []  # 当前已绘制的行
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def setup(self, title: str):
+        """重建记分板，清除上次运行残留的行"""
+        if not self.enabled:
+            return
+        self.dispatch_command(f'scoreboard objectives remove {OBJECTIVE_NAME}')
+        self.dispatch_command(f'scoreboard objectives add {OBJECTIVE_NAME} dummy "{self.sanitize(title)}"')
+        self.dispatch_command(f'scoreboard objectives setdisplay sidebar {OBJECTIVE_NAME} ascending')
+        self.lines = []
+
+    def update(self, top_entries: List[Tuple[str, float]], breaker: Optional[Tuple[str, float]] = None) -> bool:
+        """
+        用最新的前N名刷新显示
+        :param top_entries: [(玩家名, 用时)]，已按用时排序
+        :param breaker: 刚刚刷新个人纪录的玩家 (玩家名, 用时)，进入前N名时记入最近破纪录列表
+        :return: 是否发生了重绘
+        """
+        if not self.enabled:
+            return False
+        top_entries = list(top_entries[:self.size])
+        if top_entries == self.top_entries:
+            return False
+        self.top_entries = top_entries
+        if breaker is not None and self.recent_num > 0 and breaker in top_entries:
+            for entry in [_ for _ in self.recent_breakers if _[0] == breaker[0]]:
+                self.recent_breakers.remove(entry)
+            self.recent_breakers.appendleft(breaker)
+        self._apply(self.build_lines())
+        return True
+
+    def clear_recent_breakers(self):
+        """清空最近破纪录列表（如赛季结束时），已绘制的行随之移除"""
+        self.recent_breakers.clear()
+        if self.enabled:
+            self._apply(self.build_lines())
+
+    def build_lines(self) -> List[str]:
+        lines = [f'{rank}. {self.sanitize(name)} {round(best, 3)}s' for rank, (name, best) in enumerate(self.top_entries, 1)]
+        if self.recent_num > 0:
+            lines.extend(f'* {self.sanitize(name)} {round(best, 3)}s' for name, best in list(self.recent_breakers)[:self.recent_num])
+        return lines
+
+    def _apply(self, new_lines: List[str]):
+        """只重绘改变的行"""
+        old_index = {line: index for index, line in enumerate(self.lines)}
+        new_set = set(new_lines)
+        # Remove lines that disappeared first, a line may move to another row in the same update
+        for line in self.lines:
+            if line not in new_set:
+                self.dispatch_command(f'scoreboard players reset "{line}" {OBJECTIVE_NAME}')
+        for index, line in enumerate(new_lines):
+            if old_index.get(line) != index:
+                self.dispatch_command(f'scoreboard players set "{line}" {OBJECTIVE_NAME} {index + 1}')
+        self.lines = new_lines
+
+    @staticmethod
+    def sanitize(text: str) -> str:
+        return str(text).replace('"', "'").replace('\\', '')
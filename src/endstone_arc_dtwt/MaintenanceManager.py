@@ -0,0 +1,147 @@
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from endstone_arc_dtwt.DatabaseManager import DatabaseManager
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+
+ARCHIVE_TABLE = 'player_records_archive'
+LAST_PLAY_DATE_INDEX = 'idx_player_records_last_play_date'
+ARCHIVE_BATCH_SIZE = 500
+VACUUM_PAGES_PER_SLICE = 256
+ANALYZE_ROW_LIMIT = 1000
+
+# Maintenance cycle steps
+STEP_IDLE = 0
+STEP_ARCHIVE = 1
+STEP_VACUUM = 2
+STEP_ANALYZE = 3
+
+
+class MaintenanceManager:
+    """
+    数据库维护
+    把长期未游玩的玩家移入归档表，玩家再次游戏时自动恢复；
+    按小片执行 incremental_vacuum 与 ANALYZE，避免长时间阻塞服务器
+    """
+
+    def __init__(self, db_manager: DatabaseManager, inactive_days: int = 180, cycle_interval: int = 3600,
+                 convert_to_incremental: bool = False):
+        """
+        :param db_manager: 数据库管理器
+        :param inactive_days: 超过多少天未游玩的玩家被归档，0为不归档
+        :param cycle_interval: 两轮维护之间的间隔秒数
+        :param convert_to_incremental: 启动时是否把旧数据库切换为增量vacuum模式（需要一次完整VACUUM）
+        """
+        self.db_manager = db_manager
+        self.inactive_days = inactive_days
+        self.cycle_interval = cycle_interval
+        self.convert_to_incremental = convert_to_incremental
+        self.incremental_vacuum_enabled = False
+        self.step = STEP_IDLE
+        self.next_cycle_time = time.monotonic()
+
+    def prepare_database(self):
+        """在建表之前调用：全新的数据库直接设为增量vacuum模式，无需VACUUM"""
+        if self.db_manager.query_one_tuple("SELECT 1 FROM sqlite_master LIMIT 1") is None:
+            self.db_manager.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    def init_tables(self):
+        """创建归档表与索引；旧数据库只在开启 convert_to_incremental 时切换为增量vacuum模式"""
+        self.db_manager.create_table(ARCHIVE_TABLE, PlayerRecord.FIELDS)
+        self.db_manager.create_index(LAST_PLAY_DATE_INDEX, "player_records", ["last_play_date"])
+
+        auto_vacuum = self.db_manager.query_one_tuple("PRAGMA auto_vacuum")
+        self.incremental_vacuum_enabled = auto_vacuum is not None and auto_vacuum[0] == 2
+        if self.incremental_vacuum_enabled:
+            return
+        if not self.convert_to_incremental:
+            print('[ARC DTWT]Database is not in incremental vacuum mode, free pages will not be released. '
+                  'Set VACUUM_CONVERT_ON_STARTUP=true to convert it with one full VACUUM on the next startup.')
+            return
+        # Switching an existing file to incremental mode needs one full VACUUM, its time grows with the file
+        print('[ARC DTWT]Converting database to incremental vacuum with a full VACUUM, startup waits until it finishes...')
+        start = time.perf_counter()
+        self.db_manager.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.db_manager.execute("VACUUM")
+        auto_vacuum = self.db_manager.query_one_tuple("PRAGMA auto_vacuum")
+        self.incremental_vacuum_enabled = auto_vacuum is not None and auto_vacuum[0] == 2
+        print(f'[ARC DTWT]Database switched to incremental vacuum in {(time.perf_counter() - start) * 1000:.1f} ms.')
+
+    def restore_player(self, xuid: str) -> bool:
+        """
+        玩家再次游戏时，将其记录从归档表移回
+        :param xuid: 玩家XUID
+        :return: 是否恢复了记录
+        """
+        if self.db_manager.query_one_tuple(f"SELECT 1 FROM {ARCHIVE_TABLE} WHERE xuid = ?", (xuid,)) is None:
+            return False
+        return self.db_manager.execute_batch([
+            (f"INSERT OR IGNORE INTO player_records ({PlayerRecord.COLUMNS}) "
+             f"SELECT {PlayerRecord.COLUMNS} FROM {ARCHIVE_TABLE} WHERE xuid = ?", (xuid,)),
+            (f"DELETE FROM {ARCHIVE_TABLE} WHERE xuid = ?", (xuid,))
+        ])
+
+    def run_slice(self) -> int:
+        """
+        执行一小片维护工作，由定时任务反复调用
+        :return: 本片归档的玩家数量
+        """
+        if self.step == STEP_IDLE:
+            if time.monotonic() < self.next_cycle_time:
+                return 0
+            self.step = STEP_ARCHIVE if self.inactive_days > 0 else self.get_step_after_archive()
+
+        if self.step == STEP_ARCHIVE:
+            archived = self.archive_inactive_players(ARCHIVE_BATCH_SIZE)
+            if archived < ARCHIVE_BATCH_SIZE:
+                self.step = self.get_step_after_archive()
+            return archived
+
+        if self.step == STEP_VACUUM:
+            if not self.incremental_vacuum(VACUUM_PAGES_PER_SLICE):
+                self.step = STEP_ANALYZE
+            return 0
+
+        if self.step == STEP_ANALYZE:
+            self.db_manager.execute(f"PRAGMA analysis_limit = {ANALYZE_ROW_LIMIT}")
+            self.db_manager.execute("ANALYZE")
+            self.step = STEP_IDLE
+            self.next_cycle_time = time.monotonic() + self.cycle_interval
+        return 0
+
+    def get_step_after_archive(self) -> int:
+        # Without incremental mode the free list never shrinks, the vacuum step would never finish
+        return STEP_VACUUM if self.incremental_vacuum_enabled else STEP_ANALYZE
+
+    def archive_inactive_players(self, limit: int) -> int:
+        """
+        归档一批长期未游玩的玩家
+        :param limit: 本批最多归档的数量
+        :return: 实际归档的数量
+        """
+        cutoff = (date.today() - timedelta(days=self.inactive_days)).isoformat()
+        rows = self.db_manager.query_all_tuple(
+            "SELECT xuid FROM player_records WHERE last_play_date < ? LIMIT ?",
+            (cutoff, limit)
+        )
+        if not rows:
+            return 0
+        placeholders = ','.join('?' * len(rows))
+        xuids = tuple(row[0] for row in rows)
+        success = self.db_manager.execute_batch([
+            (f"INSERT OR REPLACE INTO {ARCHIVE_TABLE} ({PlayerRecord.COLUMNS}) "
+             f"SELECT {PlayerRecord.COLUMNS} FROM player_records WHERE xuid IN ({placeholders})", xuids),
+            (f"DELETE FROM player_records WHERE xuid IN ({placeholders})", xuids)
+        ])
+        return len(xuids) if success else 0
+
+    def incremental_vacuum(self, pages: int) -> bool:
+        """
+        释放一部分空闲页
+        :param pages: 本片最多释放的页数
+        :return: 是否仍有空闲页待释放
+        """
+        self.db_manager.query_all_tuple(f"PRAGMA incremental_vacuum({pages})")
+        freelist: Optional[tuple] = self.db_manager.query_one_tuple("PRAGMA freelist_count")
+        return freelist is not None and freelist[0] > 0
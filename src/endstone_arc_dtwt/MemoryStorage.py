@@ -0,0 +1,186 @@
+import bisect
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+from endstone_arc_dtwt.RunStatistics import RunStatistics
+from endstone_arc_dtwt.StorageBackend import StorageBackend
+
+
+class MemoryStorage(StorageBackend):
+    """
+    纯内存存储后端，用于测试与基准测试，重启后数据丢失
+    排名通过按 (用时, xuid) 排序的列表二分查找得到
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.facility: Optional[Dict[str, Any]] = None
+        self.records: Dict[str, PlayerRecord] = {}
+        self.ranking: List[Tuple[float, str]] = []
+        # Ended seasons keep their records dict and ranking list, closing a season only swaps references
+        self.season_id = 1
+        self.seasons: Dict[int, Tuple[Dict[str, PlayerRecord], List[Tuple[float, str]]]] = {}
+        self.season_rewards: Dict[int, Tuple[str, int, int, int]] = {}  # reward id -> (xuid, season, rank, amount)
+        self.next_reward_id = 1
+        self.alltime: Dict[str, PlayerRecord] = {}
+        self.statistics: Dict[str, str] = {}
+
+    # Facility
+    def save_facility(self, screen_start: tuple, screen_end: tuple, trigger_pos: tuple) -> bool:
+        with self.lock:
+            self.facility = {
+                'screen_start': tuple(screen_start),
+                'screen_end': tuple(screen_end),
+                'trigger_pos': tuple(trigger_pos)
+            }
+        return True
+
+    def load_facility(self) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return dict(self.facility) if self.facility is not None else None
+
+    # Player record
+    def get_player_record(self, xuid: str) -> Optional[PlayerRecord]:
+        with self.lock:
+            record = self.records.get(xuid)
+            return PlayerRecord(*record.to_row()) if record is not None else None
+
+    def update_player_record(self, xuid: str, player_name: str, time: float, raw_time: float,
+                             play_date: str) -> Tuple[bool, bool]:
+        with self.lock:
+            self._merge_alltime(PlayerRecord(xuid, player_name, time, play_date, raw_time))
+            record = self.records.get(xuid)
+            if record is None:
+                self._put(PlayerRecord(xuid, player_name, time, play_date, raw_time))
+                return True, True
+            record.player_name = player_name
+            record.last_play_date = play_date
+            if time < record.best_record:
+                self._remove_rank(record)
+                record.best_record = time
+                record.best_raw_record = raw_time
+                bisect.insort(self.ranking, (time, xuid))
+                return True, True
+            return True, False
+
+    def save_player_record(self, record: PlayerRecord, run: Optional[PlayerRecord] = None) -> bool:
+        with self.lock:
+            if run is not None:
+                self._merge_alltime(run)
+            old_record = self.records.get(record.xuid)
+            if old_record is not None:
+                self._remove_rank(old_record)
+            self._put(PlayerRecord(*record.to_row()))
+        return True
+
+    def get_player_rank(self, xuid: str) -> Optional[int]:
+        with self.lock:
+            record = self.records.get(xuid)
+            if record is None:
+                return None
+            return bisect.bisect_left(self.ranking, (record.best_record, xuid)) + 1
+
+    def get_leaderboard(self, limit: int, reverse: bool = False) -> List[Tuple[str, float]]:
+        with self.lock:
+            entries = self.ranking[-limit:][::-1] if reverse else self.ranking[:limit]
+            return [(self.records[xuid].player_name, best) for best, xuid in entries]
+
+    def get_average_time(self) -> Optional[float]:
+        with self.lock:
+            if not self.ranking:
+                return None
+            return sum(best for best, _ in self.ranking) / len(self.ranking)
+
+    def import_player_records(self, records: Iterable[PlayerRecord]) -> bool:
+        with self.lock:
+            for record in records:
+                self.records[record.xuid] = PlayerRecord(*record.to_row())
+                self._merge_alltime(record)
+            self.ranking = sorted((record.best_record, record.xuid) for record in self.records.values())
+        return True
+
+    # Season
+    def get_current_season(self) -> Optional[int]:
+        return self.season_id
+
+    def close_season(self, rewards: Sequence[int], today: str) -> Optional[int]:
+        with self.lock:
+            season_id = self.season_id
+            for rank, (amount, (_, xuid)) in enumerate(zip(rewards, self.ranking), start=1):
+                if amount > 0:
+                    self.season_rewards[self.next_reward_id] = (xuid, season_id, rank, amount)
+                    self.next_reward_id += 1
+            self.seasons[season_id] = (self.records, self.ranking)
+            self.records = {}
+            self.ranking = []
+            self.season_id += 1
+            return season_id
+
+    def get_season_leaderboard(self, season_id: int, limit: int) -> List[Tuple[str, float]]:
+        with self.lock:
+            if season_id not in self.seasons:
+                return []
+            records, ranking = self.seasons[season_id]
+            return [(records[xuid].player_name, best) for best, xuid in ranking[:limit]]
+
+    def get_season_rewards(self, xuid: str) -> List[Tuple[int, int, int, int]]:
+        with self.lock:
+            return sorted(((reward_id, season_id, rank, amount)
+                           for reward_id, (owner, season_id, rank, amount) in self.season_rewards.items() if owner == xuid),
+                          key=lambda _: _[1])
+
+    def complete_season_reward(self, reward_id: int) -> bool:
+        with self.lock:
+            self.season_rewards.pop(reward_id, None)
+        return True
+
+    def get_alltime_record(self, xuid: str) -> Optional[PlayerRecord]:
+        with self.lock:
+            record = self.alltime.get(xuid)
+            return PlayerRecord(*record.to_row()) if record is not None else None
+
+    def get_alltime_rank(self, xuid: str) -> Optional[int]:
+        # All-time queries are rare here, a scan keeps this test backend simple
+        with self.lock:
+            record = self.alltime.get(xuid)
+            if record is None:
+                return None
+            return 1 + sum(1 for _ in self.alltime.values() if (_.best_record, _.xuid) < (record.best_record, xuid))
+
+    def get_alltime_leaderboard(self, limit: int) -> List[Tuple[str, float]]:
+        with self.lock:
+            ranking = sorted(self.alltime.values(), key=lambda _: (_.best_record, _.xuid))[:limit]
+            return [(record.player_name, record.best_record) for record in ranking]
+
+    # Statistics
+    def load_run_statistics(self, keys: Sequence[str]) -> Dict[str, RunStatistics]:
+        with self.lock:
+            return {key: RunStatistics.decode(self.statistics[key]) for key in keys if key in self.statistics}
+
+    def merge_run_statistics(self, deltas: Dict[str, RunStatistics]) -> Dict[str, RunStatistics]:
+        with self.lock:
+            merged = {}
+            for key, delta in deltas.items():
+                stats = RunStatistics.decode(self.statistics[key]) if key in self.statistics else RunStatistics()
+                stats.merge(delta)
+                self.statistics[key] = stats.encode()
+                merged[key] = stats
+            return merged
+
+    def _merge_alltime(self, run: PlayerRecord):
+        best = self.alltime.get(run.xuid)
+        if best is None or run.best_record < best.best_record:
+            self.alltime[run.xuid] = PlayerRecord(*run.to_row())
+        else:
+            best.player_name = run.player_name
+            best.last_play_date = max(best.last_play_date, run.last_play_date)
+
+    def _put(self, record: PlayerRecord):
+        self.records[record.xuid] = record
+        bisect.insort(self.ranking, (record.best_record, record.xuid))
+
+    def _remove_rank(self, record: PlayerRecord):
+        index = bisect.bisect_left(self.ranking, (record.best_record, record.xuid))
+        if index < len(self.ranking) and self.ranking[index][1] == record.xuid:
+            self.ranking.pop(index)
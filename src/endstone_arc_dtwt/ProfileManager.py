@@ -0,0 +1,107 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+MAIN_PATH = 'plugins/ARCDTWT'
+PLUGIN_PACKAGE_NAME = 'endstone_arc_dtwt'
+
+
+class ProfileManager:
+    """
+    按需性能分析器
+    关闭时不安装任何钩子，开启后在服务器主线程上记录所有事件处理与调度回调，
+    结束时将 .prof 文件与内存分配差异报告写入 plugins/ARCDTWT/profiles/
+    """
+
+    def __init__(self):
+        self.profile_dir = Path(MAIN_PATH) / 'profiles'
+        self.profiler: Optional[cProfile.Profile] = None
+        self.memory_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.started_tracemalloc = False
+        self.start_time = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.profiler is not None
+
+    def start(self, with_memory: bool = False) -> bool:
+        """
+        开始性能分析，必须在服务器主线程上调用
+        :param with_memory: 是否同时记录tracemalloc内存快照
+        :return: 是否成功开始
+        """
+        if self.is_running:
+            return False
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler is already attached to this thread
+            print(f'[ARC DTWT]Failed to start profiler: {e}')
+            return False
+        self.profiler = profiler
+        self.start_time = time.perf_counter()
+        if with_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self.started_tracemalloc = True
+            self.memory_snapshot = tracemalloc.take_snapshot()
+        return True
+
+    def stop(self) -> Optional[Tuple[Path, Optional[Path]]]:
+        """
+        停止性能分析并写出报告
+        :return: (.prof文件路径, 内存报告路径或None)，未在分析中返回None
+        """
+        if not self.is_running:
+            return None
+        self.profiler.disable()
+        duration = time.perf_counter() - self.start_time
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        file_stem = datetime.now().strftime('dtwt_%Y%m%d_%H%M%S')
+
+        profile_path = self.profile_dir / f'{file_stem}.prof'
+        self.profiler.dump_stats(str(profile_path))
+        self._write_profile_summary(self.profile_dir / f'{file_stem}.txt', duration)
+
+        memory_path = None
+        if self.memory_snapshot is not None:
+            memory_path = self.profile_dir / f'{file_stem}_memory.txt'
+            self._write_memory_diff(memory_path, tracemalloc.take_snapshot())
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+
+        self.profiler = None
+        self.memory_snapshot = None
+        self.started_tracemalloc = False
+        self.start_time = None
+        return profile_path, memory_path
+
+    def _write_profile_summary(self, summary_path: Path, duration: float):
+        """写出可读的统计摘要，单独列出本插件函数的耗时占比"""
+        stats = pstats.Stats(self.profiler)
+        total_time = stats.total_tt
+        plugin_time = sum(stat[2] for func, stat in stats.stats.items() if PLUGIN_PACKAGE_NAME in func[0])
+
+        stream = io.StringIO()
+        stream.write(f'Profiled window: {duration:.2f}s\n')
+        stream.write(f'Python time on main thread: {total_time:.4f}s\n')
+        stream.write(f'ARC DTWT own time: {plugin_time:.4f}s '
+                     f'({plugin_time / total_time * 100 if total_time > 0 else 0:.1f}% of profiled Python time)\n\n')
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PLUGIN_PACKAGE_NAME, 40)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(40)
+        summary_path.write_text(stream.getvalue(), encoding='utf-8')
+
+    def _write_memory_diff(self, memory_path: Path, end_snapshot: tracemalloc.Snapshot):
+        """写出两次内存快照之间分配最多的位置"""
+        top_stats = end_snapshot.compare_to(self.memory_snapshot, 'lineno')
+        with memory_path.open('w', encoding='utf-8') as f:
+            f.write('Top 50 allocation differences:\n')
+            for stat in top_stats[:50]:
+                f.write(f'{stat}\n')
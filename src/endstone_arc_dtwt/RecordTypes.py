@@ -0,0 +1,55 @@
+from typing import Optional
+
+
+class PlayerRecord:
+    """玩家记录行，字段顺序与 player_records 表一致"""
+    __slots__ = ('xuid', 'player_name', 'best_record', 'last_play_date', 'best_raw_record')
+
+    COLUMNS = 'xuid, player_name, best_record, last_play_date, best_raw_record'
+    # Schema shared by player_records, its archive, season tables and the all-time table
+    FIELDS = {
+        "xuid": "TEXT PRIMARY KEY",
+        "player_name": "TEXT NOT NULL",
+        "best_record": "REAL NOT NULL",
+        "last_play_date": "TEXT",
+        "best_raw_record": "REAL"
+    }
+
+    def __init__(self, xuid: str, player_name: str, best_record: float, last_play_date: Optional[str],
+                 best_raw_record: Optional[float] = None):
+        self.xuid = xuid
+        self.player_name = player_name
+        self.best_record = best_record  # 扣除服务器延迟后的最佳用时，用于排名
+        self.last_play_date = last_play_date
+        self.best_raw_record = best_raw_record  # 最佳纪录对应的原始用时
+
+    def to_row(self) -> tuple:
+        """按 COLUMNS 顺序返回字段元组"""
+        return self.xuid, self.player_name, self.best_record, self.last_play_date, self.best_raw_record
+
+    def __repr__(self):
+        return (f'PlayerRecord({self.xuid!r}, {self.player_name!r}, {self.best_record!r}, '
+                f'{self.last_play_date!r}, {self.best_raw_record!r})')
+
+
+class FacilityRecord:
+    """游戏设施行，字段顺序与 game_facilities 表一致（不含id）"""
+    __slots__ = ('screen_start', 'screen_end', 'trigger_pos')
+
+    COLUMNS = ('screen_start_x, screen_start_y, screen_start_z, '
+               'screen_end_x, screen_end_y, screen_end_z, '
+               'trigger_x, trigger_y, trigger_z')
+
+    def __init__(self, screen_start_x: int, screen_start_y: int, screen_start_z: int,
+                 screen_end_x: int, screen_end_y: int, screen_end_z: int,
+                 trigger_x: int, trigger_y: int, trigger_z: int):
+        self.screen_start = (screen_start_x, screen_start_y, screen_start_z)
+        self.screen_end = (screen_end_x, screen_end_y, screen_end_z)
+        self.trigger_pos = (trigger_x, trigger_y, trigger_z)
+
+    def to_dict(self) -> dict:
+        return {
+            'screen_start': self.screen_start,
+            'screen_end': self.screen_end,
+            'trigger_pos': self.trigger_pos
+        }
@@ -0,0 +1,126 @@
+from collections import deque
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# Priorities, input frames always go before cosmetic ones
+PRIORITY_INPUT = 0
+PRIORITY_COSMETIC = 1
+
+Position = Tuple[int, int, int]
+FillOperation = Tuple[Position, Position, str]
+
+
+class RenderScheduler:
+    """
+    按tick预算分发方块更新
+    输入相关的画面（玩家点击后的刷新）优先且尽量在当前tick内完成，
+    装饰性动画（胜利闪烁、重置擦除、待机动画）按帧排队，只使用剩余预算
+    """
+
+    def __init__(self, dispatch_fill: Callable[[Position, Position, str], None], block_budget_per_tick: int = 20):
+        """
+        :param dispatch_fill: 实际执行fill命令的函数 (pos1, pos2, block_name)
+        :param block_budget_per_tick: 每tick允许更新的方块数量
+        """
+        self.dispatch_fill = dispatch_fill
+        self.block_budget_per_tick = max(1, block_budget_per_tick)
+        self.current_tick = 0
+        self.used_budget = 0
+        self.input_queue: deque = deque()  # FillOperation, or a callback to run once everything before it went out
+        self.cosmetic_queue: deque = deque()  # (due_tick, FillOperation)
+        self.last_cosmetic_tick = 0
+
+    @property
+    def is_idle(self) -> bool:
+        return not self.input_queue and not self.cosmetic_queue
+
+    def submit(self, operations: Iterable[FillOperation], priority: int = PRIORITY_INPUT, delay: int = 0,
+               on_dispatched: Optional[Callable[[], None]] = None):
+        """
+        提交一帧方块更新
+        :param operations: fill操作列表
+        :param priority: PRIORITY_INPUT 或 PRIORITY_COSMETIC
+        :param delay: 仅对装饰帧有效，距离上一装饰帧的tick间隔
+        :param on_dispatched: 仅对输入帧有效，这一帧全部分发后调用
+        """
+        operations = [piece for operation in operations for piece in self.split_operation(operation, self.block_budget_per_tick)]
+        if priority == PRIORITY_INPUT:
+            self.input_queue.extend(operations)
+            if on_dispatched is not None:
+                self.input_queue.append(on_dispatched)
+            # Input frames don't wait for the next tick if budget is left
+            self._drain()
+            return
+        due_tick = max(self.current_tick, self.last_cosmetic_tick) + delay
+        self.last_cosmetic_tick = due_tick
+        for operation in operations:
+            self.cosmetic_queue.append((due_tick, operation))
+
+    def submit_animation(self, frames: Iterable[Tuple[int, Iterable[FillOperation]]]):
+        """
+        提交装饰性动画
+        :param frames: [(距上一帧的tick间隔, fill操作列表)]
+        """
+        for delay, operations in frames:
+            self.submit(operations, PRIORITY_COSMETIC, delay)
+
+    def clear_cosmetic(self):
+        """丢弃所有尚未绘制的装饰帧"""
+        self.cosmetic_queue.clear()
+        self.last_cosmetic_tick = self.current_tick
+
+    def on_tick(self):
+        """每tick调用一次，重置预算并分发排队的更新"""
+        self.current_tick += 1
+        self.used_budget = 0
+        self._drain()
+
+    def _drain(self):
+        while self.input_queue:
+            if callable(self.input_queue[0]):
+                self.input_queue.popleft()()
+                continue
+            if not self._try_dispatch(self.input_queue[0]):
+                return
+            self.input_queue.popleft()
+        while self.cosmetic_queue and self.cosmetic_queue[0][0] <= self.current_tick:
+            if not self._try_dispatch(self.cosmetic_queue[0][1]):
+                return
+            self.cosmetic_queue.popleft()
+
+    def _try_dispatch(self, operation: FillOperation) -> bool:
+        cost = self.get_operation_cost(operation)
+        # Operations are split to the budget on submit, one only exceeds it when the budget shrank since
+        if self.used_budget > 0 and self.used_budget + cost > self.block_budget_per_tick:
+            return False
+        self.dispatch_fill(*operation)
+        self.used_budget += cost
+        return True
+
+    @staticmethod
+    def get_operation_cost(operation: FillOperation) -> int:
+        pos1, pos2, _ = operation
+        return ((abs(pos1[0] - pos2[0]) + 1) *
+                (abs(pos1[1] - pos2[1]) + 1) *
+                (abs(pos1[2] - pos2[2]) + 1))
+
+    @classmethod
+    def split_operation(cls, operation: FillOperation, budget: int) -> List[FillOperation]:
+        """
+        把超出预算的fill拆成每块不超过预算的小块：先按y分层，再沿水平方向切段
+        :param operation: fill操作
+        :param budget: 每块允许的方块数量
+        :return: fill操作列表，未超出预算时为原操作
+        """
+        if cls.get_operation_cost(operation) <= budget:
+            return [operation]
+        pos1, pos2, block_name = operation
+        low = [min(a, b) for a, b in zip(pos1, pos2)]
+        high = [max(a, b) for a, b in zip(pos1, pos2)]
+        z_step = min(high[2] - low[2] + 1, budget)
+        x_step = max(1, budget // z_step)
+        pieces = []
+        for y in range(low[1], high[1] + 1):
+            for x in range(low[0], high[0] + 1, x_step):
+                for z in range(low[2], high[2] + 1, z_step):
+                    pieces.append(((x, y, z), (min(x + x_step - 1, high[0]), y, min(z + z_step - 1, high[2])), block_name))
+        return pieces
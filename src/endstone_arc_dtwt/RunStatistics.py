@@ -0,0 +1,135 @@
+import math
+from typing import Dict, Optional
+
+# Relative error of every quantile estimate
+SKETCH_RELATIVE_ACCURACY = 0.01
+# Times below this are counted in the lowest bucket, no real run is that fast
+SKETCH_MIN_VALUE = 0.01
+
+
+class QuantileSketch:
+    """
+    可合并的流式分位数草图（对数分桶，同 DDSketch）
+    每个桶覆盖相对宽度固定的时间区间，任意分位数的相对误差不超过 SKETCH_RELATIVE_ACCURACY；
+    桶数只与用时的取值范围有关，与记录的次数无关，两个草图相加即为合并
+    """
+    __slots__ = ('bins', 'count')
+
+    GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+    LOG_GAMMA = math.log(GAMMA)
+
+    def __init__(self):
+        self.bins: Dict[int, int] = {}
+        self.count = 0
+
+    @classmethod
+    def key(cls, value: float) -> int:
+        return math.ceil(math.log(max(value, SKETCH_MIN_VALUE)) / cls.LOG_GAMMA)
+
+    @classmethod
+    def value(cls, key: int) -> float:
+        """桶的代表值，使桶内任意值的相对误差最小"""
+        return 2 * cls.GAMMA ** key / (cls.GAMMA + 1)
+
+    def add(self, value: float, count: int = 1):
+        key = self.key(value)
+        self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+
+    def merge(self, other: 'QuantileSketch'):
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        :param q: 分位数，0~1
+        :return: 估计值，无数据返回None
+        """
+        if self.count == 0:
+            return None
+        target = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > target:
+                return self.value(key)
+        return self.value(max(self.bins))
+
+    def rank(self, value: float) -> float:
+        """
+        :param value: 用时
+        :return: 用时严格慢于 value 的记录所占比例，0~1
+        """
+        if self.count == 0:
+            return 0.0
+        key = self.key(value)
+        return sum(count for bin_key, count in self.bins.items() if bin_key > key) / self.count
+
+    def encode(self) -> str:
+        """紧凑文本：按桶序排列的 桶差值:次数，差值编码使相邻桶只占几个字符"""
+        parts = []
+        previous = 0
+        for key in sorted(self.bins):
+            parts.append(f'{key - previous}:{self.bins[key]}')
+            previous = key
+        return ','.join(parts)
+
+    @classmethod
+    def decode(cls, text: str) -> 'QuantileSketch':
+        sketch = cls()
+        key = 0
+        for part in filter(None, text.split(',')):
+            delta, count = part.split(':')
+            key += int(delta)
+            sketch.bins[key] = int(count)
+            sketch.count += int(count)
+        return sketch
+
+
+class RunStatistics:
+    """一个统计维度（设施 + 时间段）的累计数据：胜负与超时次数、完成用时草图"""
+    __slots__ = ('wins', 'losses', 'timeouts', 'total_time', 'sketch')
+
+    def __init__(self, wins: int = 0, losses: int = 0, timeouts: int = 0, total_time: float = 0.0,
+                 sketch: Optional[QuantileSketch] = None):
+        self.wins = wins
+        self.losses = losses  # 点错导致的失败，不含超时
+        self.timeouts = timeouts
+        self.total_time = total_time  # 完成用时之和，用于平均值
+        self.sketch = sketch if sketch is not None else QuantileSketch()
+
+    @property
+    def runs(self) -> int:
+        return self.wins + self.losses + self.timeouts
+
+    def record(self, success: bool, time: Optional[float] = None, timeout: bool = False):
+        """
+        记录一局
+        :param success: 是否通关
+        :param time: 通关用时
+        :param timeout: 失败是否因为超时
+        """
+        if success:
+            self.wins += 1
+            self.total_time += time
+            self.sketch.add(time)
+        elif timeout:
+            self.timeouts += 1
+        else:
+            self.losses += 1
+
+    def merge(self, other: 'RunStatistics'):
+        self.wins += other.wins
+        self.losses += other.losses
+        self.timeouts += other.timeouts
+        self.total_time += other.total_time
+        self.sketch.merge(other.sketch)
+
+    def encode(self) -> str:
+        return f'{self.wins};{self.losses};{self.timeouts};{self.total_time:.3f};{self.sketch.encode()}'
+
+    @classmethod
+    def decode(cls, text: str) -> 'RunStatistics':
+        wins, losses, timeouts, total_time, sketch = text.split(';', 4)
+        return cls(int(wins), int(losses), int(timeouts), float(total_time), QuantileSketch.decode(sketch))
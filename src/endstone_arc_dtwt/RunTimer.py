@@ -0,0 +1,115 @@
+import time
+from typing import List, Optional, Tuple
+
+TICK_NS = 50_000_000  # 20 TPS
+
+
+class RunTiming:
+    """一局游戏的计时结果"""
+    __slots__ = ('raw_ns', 'lag_ns', 'start_tick', 'end_tick', 'taps')
+
+    def __init__(self, raw_ns: int, lag_ns: int, start_tick: int, end_tick: int, taps: List[Tuple[int, int]]):
+        self.raw_ns = raw_ns
+        self.lag_ns = lag_ns
+        self.start_tick = start_tick
+        self.end_tick = end_tick
+        self.taps = taps  # [(距开始的纳秒数, 服务器tick)]
+
+    @property
+    def raw_time(self) -> float:
+        """单调时钟测得的原始用时（秒）"""
+        return self.raw_ns / 1e9
+
+    @property
+    def lag_time(self) -> float:
+        """游戏期间服务器tick延迟累计（秒）"""
+        return self.lag_ns / 1e9
+
+    @property
+    def compensated_time(self) -> float:
+        """扣除服务器延迟后的用时（秒），用于排名"""
+        return max(self.raw_ns - self.lag_ns, 0) / 1e9
+
+    @property
+    def ticks(self) -> int:
+        return self.end_tick - self.start_tick
+
+    def get_tap_times(self) -> List[Tuple[float, int]]:
+        """
+        :return: [(距开始的秒数, 服务器tick)]，每次正确点击一项
+        """
+        return [(offset_ns / 1e9, tick) for offset_ns, tick in self.taps]
+
+
+class RunTimer:
+    """
+    基于单调时钟的游戏计时器
+    每tick调用 on_tick 采样；服务器延迟按净值计算：采样到的tick之间实际经过的时间减去 tick数 × 50ms，
+    提前与滞后的tick相互抵消，正常的调度抖动不会被计为延迟
+    """
+
+    def __init__(self):
+        self.start_ns: Optional[int] = None
+        self.start_tick = 0
+        self.first_tick: Optional[int] = None
+        self.first_tick_ns: Optional[int] = None
+        self.last_tick: Optional[int] = None
+        self.last_tick_ns: Optional[int] = None
+        self.head_lag_ns = 0
+        self.taps: List[Tuple[int, int]] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self.start_ns is not None
+
+    def start(self, tick: int):
+        self.start_ns = time.monotonic_ns()
+        self.start_tick = tick
+        self.first_tick = None
+        self.first_tick_ns = None
+        self.last_tick = None
+        self.last_tick_ns = None
+        self.head_lag_ns = 0
+        self.taps = []
+
+    def on_tick(self, tick: int):
+        """每服务器tick调用一次，记录tick的时间戳"""
+        if self.start_ns is None:
+            return
+        now = time.monotonic_ns()
+        if self.first_tick_ns is None:
+            # The run starts part way into a tick, only a wait longer than a whole tick is lag
+            self.head_lag_ns = max(now - self.start_ns - TICK_NS, 0)
+            self.first_tick = tick
+            self.first_tick_ns = now
+        self.last_tick = tick
+        self.last_tick_ns = now
+
+    def record_tap(self, tick: int):
+        if self.start_ns is None:
+            return
+        self.taps.append((time.monotonic_ns() - self.start_ns, tick))
+
+    def stop(self, tick: int) -> Optional[RunTiming]:
+        """
+        结束计时
+        :param tick: 当前服务器tick
+        :return: 计时结果，未在计时中返回None
+        """
+        if self.start_ns is None:
+            return None
+        now = time.monotonic_ns()
+        if self.first_tick_ns is None:
+            lag_ns = max(now - self.start_ns - TICK_NS, 0)
+        else:
+            # Signed: early ticks cancel late ones, clamped once below
+            net_ns = (self.last_tick_ns - self.first_tick_ns) - (self.last_tick - self.first_tick) * TICK_NS
+            # An overdue current tick is lag too, it has no sample yet
+            tail_ns = max(now - self.last_tick_ns - TICK_NS, 0)
+            lag_ns = max(self.head_lag_ns + net_ns + tail_ns, 0)
+        timing = RunTiming(now - self.start_ns, lag_ns, self.start_tick, tick, self.taps)
+        self.start_ns = None
+        self.first_tick_ns = None
+        self.last_tick_ns = None
+        self.taps = []
+        return timing
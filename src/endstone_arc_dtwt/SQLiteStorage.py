@@ -0,0 +1,201 @@
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from endstone_arc_dtwt.DatabaseManager import DatabaseManager
+from endstone_arc_dtwt.MaintenanceManager import MaintenanceManager
+from endstone_arc_dtwt.RecordTypes import PlayerRecord, FacilityRecord
+from endstone_arc_dtwt.RunStatistics import RunStatistics
+from endstone_arc_dtwt.SeasonManager import SeasonManager
+from endstone_arc_dtwt.StorageBackend import StorageBackend
+
+
+class SQLiteStorage(StorageBackend):
+    """基于本地SQLite文件的存储后端"""
+
+    def __init__(self, db_manager: DatabaseManager, archive_inactive_days: int = 180, maintenance_interval: int = 3600,
+                 convert_to_incremental_vacuum: bool = False):
+        """
+        :param db_manager: 数据库管理器
+        :param archive_inactive_days: 超过多少天未游玩的玩家被归档，0为不归档
+        :param maintenance_interval: 两轮维护之间的间隔秒数
+        :param convert_to_incremental_vacuum: 启动时是否把旧数据库切换为增量vacuum模式（一次完整VACUUM，耗时随文件大小增长）
+        """
+        self.db_manager = db_manager
+        self.maintenance_manager = MaintenanceManager(db_manager, archive_inactive_days, maintenance_interval,
+                                                      convert_to_incremental_vacuum)
+        self.season_manager = SeasonManager(db_manager)
+
+    def init(self) -> None:
+        """初始化数据库表结构"""
+        self.maintenance_manager.prepare_database()
+
+        # 游戏设施信息表
+        self.db_manager.create_table("game_facilities", {
+            "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+            "screen_start_x": "INTEGER NOT NULL",
+            "screen_start_y": "INTEGER NOT NULL",
+            "screen_start_z": "INTEGER NOT NULL",
+            "screen_end_x": "INTEGER NOT NULL",
+            "screen_end_y": "INTEGER NOT NULL",
+            "screen_end_z": "INTEGER NOT NULL",
+            "trigger_x": "INTEGER NOT NULL",
+            "trigger_y": "INTEGER NOT NULL",
+            "trigger_z": "INTEGER NOT NULL"
+        })
+
+        # 玩家记录表
+        self.db_manager.create_table("player_records", PlayerRecord.FIELDS)
+        # Databases created before lag compensation only have best_record
+        self.db_manager.ensure_column("player_records", "best_raw_record", "REAL")
+
+        # 统计表，每个维度一行，内容为 RunStatistics 的紧凑文本
+        self.db_manager.create_table("run_statistics", {
+            "stat_key": "TEXT PRIMARY KEY",
+            "data": "TEXT NOT NULL"
+        })
+
+        self.maintenance_manager.init_tables()
+        self.season_manager.init_tables(date.today().isoformat())
+
+    def close(self) -> None:
+        self.db_manager.close()
+
+    # Facility
+    def save_facility(self, screen_start: tuple, screen_end: tuple, trigger_pos: tuple) -> bool:
+        # 删除旧设施并插入新设施
+        return self.db_manager.execute_batch([
+            ("DELETE FROM game_facilities", ()),
+            (f"INSERT INTO game_facilities ({FacilityRecord.COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?)",
+             tuple(screen_start) + tuple(screen_end) + tuple(trigger_pos))
+        ])
+
+    def load_facility(self) -> Optional[Dict[str, Any]]:
+        result = self.db_manager.query_one_tuple(
+            f"SELECT {FacilityRecord.COLUMNS} FROM game_facilities LIMIT 1",
+            record_type=FacilityRecord
+        )
+        return result.to_dict() if result is not None else None
+
+    # Player record
+    def get_player_record(self, xuid: str) -> Optional[PlayerRecord]:
+        return self.db_manager.query_one_tuple(
+            f"SELECT {PlayerRecord.COLUMNS} FROM player_records WHERE xuid = ?",
+            (xuid,),
+            PlayerRecord
+        )
+
+    def update_player_record(self, xuid: str, player_name: str, time: float, raw_time: float,
+                             play_date: str) -> Tuple[bool, bool]:
+        existing_record = self.get_player_record(xuid)
+        run = PlayerRecord(xuid, player_name, time, play_date, raw_time)
+
+        if existing_record is None:
+            # 玩家不存在，插入新记录
+            return self.save_player_record(run, run), True  # 新玩家，算作破纪录
+
+        # 更新最后游戏日期，新记录更好时更新记录
+        is_new_record = time < existing_record.best_record
+        record = run if is_new_record else PlayerRecord(
+            xuid, player_name, existing_record.best_record, play_date, existing_record.best_raw_record)
+        return self.save_player_record(record, run), is_new_record
+
+    def save_player_record(self, record: PlayerRecord, run: Optional[PlayerRecord] = None) -> bool:
+        statements = [(f"INSERT OR REPLACE INTO player_records ({PlayerRecord.COLUMNS}) VALUES (?,?,?,?,?)", record.to_row())]
+        if run is not None:
+            statements.append(self.season_manager.get_alltime_merge(run))
+        return self.db_manager.execute_batch(statements)
+
+    def get_player_rank(self, xuid: str) -> Optional[int]:
+        sql = """
+        WITH RankedPlayers AS (
+            SELECT xuid,
+                   ROW_NUMBER() OVER (ORDER BY best_record ASC) as rank
+            FROM player_records
+        )
+        SELECT rank
+        FROM RankedPlayers
+        WHERE xuid = ?
+        """
+        result = self.db_manager.query_one_tuple(sql, (xuid,))
+        return result[0] if result else None
+
+    def get_leaderboard(self, limit: int, reverse: bool = False) -> List[Tuple[str, float]]:
+        order = "DESC" if reverse else "ASC"
+        sql = f"""
+        SELECT player_name, best_record
+        FROM player_records
+        ORDER BY best_record {order}
+        LIMIT ?
+        """
+        return self.db_manager.query_all_tuple(sql, (limit,))
+
+    def get_average_time(self) -> Optional[float]:
+        result = self.db_manager.query_one_tuple("SELECT AVG(best_record) FROM player_records")
+        return result[0] if result else None
+
+    def import_player_records(self, records: Iterable[PlayerRecord]) -> bool:
+        rows = [record.to_row() for record in records]
+        if not self.db_manager.upsert_many(
+            "player_records",
+            ("xuid", "player_name", "best_record", "last_play_date", "best_raw_record"),
+            rows,
+            ("xuid",)
+        ):
+            return False
+        return self.season_manager.merge_alltime_many(rows)
+
+    # Season
+    def get_current_season(self) -> Optional[int]:
+        return self.season_manager.get_current_season()
+
+    def close_season(self, rewards: Sequence[int], today: str) -> Optional[int]:
+        return self.season_manager.close_season(rewards, today)
+
+    def get_season_leaderboard(self, season_id: int, limit: int) -> List[Tuple[str, float]]:
+        return self.season_manager.get_season_leaderboard(season_id, limit)
+
+    def get_season_rewards(self, xuid: str) -> List[Tuple[int, int, int, int]]:
+        return self.season_manager.get_rewards(xuid)
+
+    def complete_season_reward(self, reward_id: int) -> bool:
+        return self.season_manager.complete_reward(reward_id)
+
+    def get_alltime_record(self, xuid: str) -> Optional[PlayerRecord]:
+        return self.season_manager.get_alltime_record(xuid)
+
+    def get_alltime_rank(self, xuid: str) -> Optional[int]:
+        return self.season_manager.get_alltime_rank(xuid)
+
+    def get_alltime_leaderboard(self, limit: int) -> List[Tuple[str, float]]:
+        return self.season_manager.get_alltime_leaderboard(limit)
+
+    # Statistics
+    def load_run_statistics(self, keys: Sequence[str]) -> Dict[str, RunStatistics]:
+        if not keys:
+            return {}
+        rows = self.db_manager.query_all_tuple(
+            f"SELECT stat_key, data FROM run_statistics WHERE stat_key IN ({','.join('?' * len(keys))})",
+            tuple(keys)
+        )
+        return {key: RunStatistics.decode(data) for key, data in rows}
+
+    def merge_run_statistics(self, deltas: Dict[str, RunStatistics]) -> Dict[str, RunStatistics]:
+        merged = self.load_run_statistics(list(deltas))
+        for key, delta in deltas.items():
+            merged.setdefault(key, RunStatistics()).merge(delta)
+        success = self.db_manager.execute_batch([
+            ("INSERT OR REPLACE INTO run_statistics (stat_key, data) VALUES (?, ?)", (key, stats.encode()))
+            for key, stats in merged.items()
+        ])
+        return merged if success else {}
+
+    # Reward
+    def get_last_play_date(self, xuid: str) -> Optional[str]:
+        return self.season_manager.get_last_play_date(xuid)
+
+    # Maintenance
+    def restore_player(self, xuid: str) -> bool:
+        return self.maintenance_manager.restore_player(xuid)
+
+    def run_maintenance_slice(self) -> int:
+        return self.maintenance_manager.run_slice()
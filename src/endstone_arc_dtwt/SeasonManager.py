@@ -0,0 +1,199 @@
+from typing import List, Optional, Sequence, Tuple
+
+from endstone_arc_dtwt.DatabaseManager import DatabaseManager
+from endstone_arc_dtwt.MaintenanceManager import ARCHIVE_TABLE, LAST_PLAY_DATE_INDEX
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+
+SEASONS_TABLE = 'seasons'
+ALLTIME_TABLE = 'player_records_alltime'
+SEASON_REWARDS_TABLE = 'season_rewards'
+# Merges one run into the all-time record, SET expressions all see the old row so best_raw_record is compared before best_record changes
+ALLTIME_MERGE_SQL = f"""
+INSERT INTO {ALLTIME_TABLE} ({PlayerRecord.COLUMNS}) VALUES (?,?,?,?,?)
+ON CONFLICT(xuid) DO UPDATE SET
+    player_name = excluded.player_name,
+    last_play_date = MAX(last_play_date, excluded.last_play_date),
+    best_raw_record = CASE WHEN excluded.best_record < best_record THEN excluded.best_raw_record ELSE best_raw_record END,
+    best_record = MIN(best_record, excluded.best_record)
+"""
+
+
+def season_table(season_id: int) -> str:
+    """已结束赛季的记录表名"""
+    return f'player_records_season_{int(season_id)}'
+
+
+def season_archive_table(season_id: int) -> str:
+    """已结束赛季的归档表名"""
+    return f'player_records_archive_season_{int(season_id)}'
+
+
+class SeasonManager:
+    """
+    赛季管理
+    player_records 始终是当前赛季；结束赛季时把它与归档表改名为赛季表，再建空表，
+    不删除也不重写任何行。历代最佳记录另存于 player_records_alltime，每局结束时增量更新
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        :param db_manager: 数据库管理器
+        """
+        self.db_manager = db_manager
+
+    def init_tables(self, today: str):
+        """
+        创建赛季相关表；旧数据库第一次启动时把现有记录作为第1赛季，并据此初始化历代记录
+        :param today: 今天的日期（ISO格式）
+        """
+        self.db_manager.create_table(SEASONS_TABLE, {
+            "season_id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+            "started_at": "TEXT NOT NULL",
+            "ended_at": "TEXT"
+        })
+        self.db_manager.create_table(SEASON_REWARDS_TABLE, {
+            "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+            "xuid": "TEXT NOT NULL",
+            "season_id": "INTEGER NOT NULL",
+            "rank": "INTEGER NOT NULL",
+            "amount": "INTEGER NOT NULL"
+        })
+        self.db_manager.create_index("idx_season_rewards_xuid", SEASON_REWARDS_TABLE, ["xuid"])
+        if self.db_manager.table_exists(ALLTIME_TABLE):
+            return
+        self.db_manager.execute_batch([
+            (self.db_manager.get_create_table_sql(ALLTIME_TABLE, PlayerRecord.FIELDS), ()),
+            (f"INSERT OR IGNORE INTO {ALLTIME_TABLE} ({PlayerRecord.COLUMNS}) "
+             f"SELECT {PlayerRecord.COLUMNS} FROM player_records", ()),
+            (f"INSERT OR IGNORE INTO {ALLTIME_TABLE} ({PlayerRecord.COLUMNS}) "
+             f"SELECT {PlayerRecord.COLUMNS} FROM {ARCHIVE_TABLE}", ()),
+            (f"INSERT INTO {SEASONS_TABLE} (started_at) "
+             f"SELECT ? WHERE NOT EXISTS (SELECT 1 FROM {SEASONS_TABLE} WHERE ended_at IS NULL)", (today,))
+        ])
+
+    def get_current_season(self) -> Optional[int]:
+        """
+        :return: 当前赛季编号
+        """
+        result = self.db_manager.query_one_tuple(
+            f"SELECT season_id FROM {SEASONS_TABLE} WHERE ended_at IS NULL ORDER BY season_id DESC LIMIT 1"
+        )
+        return result[0] if result else None
+
+    def close_season(self, rewards: Sequence[int], today: str) -> Optional[int]:
+        """
+        结束当前赛季并开启新赛季，在同一事务中完成
+        :param rewards: 第1名、第2名……的奖励金额，写入待领取奖励表
+        :param today: 今天的日期（ISO格式）
+        :return: 被结束的赛季编号，失败返回None
+        """
+        season_id = self.get_current_season()
+        if season_id is None:
+            return None
+        statements: List[Tuple[str, tuple]] = []
+        for rank, amount in enumerate(rewards, start=1):
+            if amount > 0:
+                statements.append((
+                    f"INSERT INTO {SEASON_REWARDS_TABLE} (xuid, season_id, rank, amount) "
+                    f"SELECT xuid, ?, ?, ? FROM player_records ORDER BY best_record ASC LIMIT 1 OFFSET ?",
+                    (season_id, rank, amount, rank - 1)
+                ))
+        statements += [
+            # Renaming keeps every row in place, the cost does not grow with the table
+            (f"ALTER TABLE player_records RENAME TO {season_table(season_id)}", ()),
+            (f"ALTER TABLE {ARCHIVE_TABLE} RENAME TO {season_archive_table(season_id)}", ()),
+            # Index names are global, the moved index has to go before the new table can have it
+            (f"DROP INDEX IF EXISTS {LAST_PLAY_DATE_INDEX}", ()),
+            (self.db_manager.get_create_table_sql("player_records", PlayerRecord.FIELDS), ()),
+            (self.db_manager.get_create_table_sql(ARCHIVE_TABLE, PlayerRecord.FIELDS), ()),
+            (f"CREATE INDEX IF NOT EXISTS {LAST_PLAY_DATE_INDEX} ON player_records (last_play_date)", ()),
+            (f"UPDATE {SEASONS_TABLE} SET ended_at = ? WHERE season_id = ?", (today, season_id)),
+            (f"INSERT INTO {SEASONS_TABLE} (started_at) VALUES (?)", (today,))
+        ]
+        return season_id if self.db_manager.execute_batch(statements) else None
+
+    def get_season_leaderboard(self, season_id: int, limit: int) -> List[Tuple[str, float]]:
+        """
+        获取已结束赛季的排行榜，与结束时的排名一致（当时已归档的玩家保留在赛季归档表中，不参与排名）
+        :param season_id: 赛季编号
+        :param limit: 获取数量
+        :return: [(玩家名, 用时)] 的列表
+        """
+        if not self.db_manager.table_exists(season_table(season_id)):
+            return []
+        return self.db_manager.query_all_tuple(
+            f"SELECT player_name, best_record FROM {season_table(season_id)} ORDER BY best_record ASC LIMIT ?",
+            (limit,)
+        )
+
+    def get_rewards(self, xuid: str) -> List[Tuple[int, int, int, int]]:
+        """
+        读取玩家待领取的赛季奖励，发放成功后再用 complete_reward 删除
+        :param xuid: 玩家XUID
+        :return: [(奖励编号, 赛季编号, 名次, 金额)] 的列表
+        """
+        return [tuple(_) for _ in self.db_manager.query_all_tuple(
+            f"SELECT id, season_id, rank, amount FROM {SEASON_REWARDS_TABLE} WHERE xuid = ? ORDER BY season_id",
+            (xuid,)
+        )]
+
+    def complete_reward(self, reward_id: int) -> bool:
+        """
+        删除已发放的赛季奖励
+        :param reward_id: 奖励编号
+        :return: 是否删除成功
+        """
+        return self.db_manager.execute_batch([(f"DELETE FROM {SEASON_REWARDS_TABLE} WHERE id = ?", (reward_id,))])
+
+    @staticmethod
+    def get_alltime_merge(run: PlayerRecord) -> Tuple[str, tuple]:
+        """
+        生成把一次完成成绩并入历代记录的语句，只写不读，与赛季记录在同一事务中执行
+        :param run: 本局成绩
+        :return: (SQL语句, SQL参数)
+        """
+        return ALLTIME_MERGE_SQL, run.to_row()
+
+    def merge_alltime_many(self, rows: Sequence[tuple]) -> bool:
+        """
+        把一批记录并入历代记录（如导入时），已有更好纪录的玩家只更新名称与最后游戏日期
+        :param rows: PlayerRecord.to_row() 格式的数据行
+        :return: 是否执行成功
+        """
+        return self.db_manager.execute_many(ALLTIME_MERGE_SQL, rows)
+
+    def get_last_play_date(self, xuid: str) -> Optional[str]:
+        """
+        获取玩家最后一次完成游戏的日期，读取历代记录，不受赛季切换与归档影响
+        :param xuid: 玩家XUID
+        :return: ISO格式日期或None
+        """
+        result = self.db_manager.query_one_tuple(f"SELECT last_play_date FROM {ALLTIME_TABLE} WHERE xuid = ?", (xuid,))
+        return result[0] if result else None
+
+    def get_alltime_record(self, xuid: str) -> Optional[PlayerRecord]:
+        return self.db_manager.query_one_tuple(
+            f"SELECT {PlayerRecord.COLUMNS} FROM {ALLTIME_TABLE} WHERE xuid = ?",
+            (xuid,),
+            PlayerRecord
+        )
+
+    def get_alltime_rank(self, xuid: str) -> Optional[int]:
+        sql = f"""
+        WITH RankedPlayers AS (
+            SELECT xuid,
+                   ROW_NUMBER() OVER (ORDER BY best_record ASC) as rank
+            FROM {ALLTIME_TABLE}
+        )
+        SELECT rank
+        FROM RankedPlayers
+        WHERE xuid = ?
+        """
+        result = self.db_manager.query_one_tuple(sql, (xuid,))
+        return result[0] if result else None
+
+    def get_alltime_leaderboard(self, limit: int) -> List[Tuple[str, float]]:
+        return self.db_manager.query_all_tuple(
+            f"SELECT player_name, best_record FROM {ALLTIME_TABLE} ORDER BY best_record ASC LIMIT ?",
+            (limit,)
+        )
@@ -15,11 +15,25 @@ class SettingManager:
         default_settings = {
             "DEFAULT_LANGUAGE_CODE": "ZH-CN",
             "DATABASE_PATH": "DTWTdata.db",
+            "STORAGE_BACKEND": "sqlite",
+            "SHARED_STORAGE_ADDRESS": "127.0.0.1:25590",
+            "SHARED_STORAGE_TIMEOUT": "2",
+            "PLAYER_CACHE_SIZE": "256",
             "TOTAL_BLACK_TILE_NUM": "20",
+            "BOARD_MAX_WIDTH": "16",
+            "BOARD_MAX_HEIGHT": "16",
             "DAILY_REWARD_AMOUNT": "500",
             "FIRST_PLACE_REWARD": "10000",
             "SECOND_PLACE_REWARD": "5000",
-            "THIRD_PLACE_REWARD": "2500"
+            "THIRD_PLACE_REWARD": "2500",
+            "RENDER_BLOCK_BUDGET_PER_TICK": "20",
+            "ATTRACT_MODE_INTERVAL": "0",
+            "ARCHIVE_INACTIVE_DAYS": "180",
+            "MAINTENANCE_INTERVAL": "3600",
+            "VACUUM_CONVERT_ON_STARTUP": "false",
+            "LEADERBOARD_DISPLAY_SIZE": "0",
+            "LEADERBOARD_RECENT_NUM": "3",
+            "SEASON_REWARDS": "20000,10000,5000"
         }
 
         # Write default settings to the file
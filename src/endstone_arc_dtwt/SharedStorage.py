@@ -0,0 +1,295 @@
+import argparse
+import ipaddress
+import json
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+from endstone_arc_dtwt.RunStatistics import RunStatistics
+from endstone_arc_dtwt.StorageBackend import StorageBackend
+
+DEFAULT_ADDRESS = ('127.0.0.1', 25590)
+# Seconds calls fail immediately after the server stopped answering, so an outage costs one timeout, not one per call
+RECONNECT_BACKOFF = 10.0
+# Operations a client may call on the served backend, facilities stay in each server's local storage
+SHARED_OPERATIONS = (
+    'get_player_record', 'update_player_record', 'save_player_record', 'get_player_rank',
+    'get_leaderboard', 'get_average_time', 'import_player_records', 'get_last_play_date',
+    'get_current_season', 'close_season', 'get_season_leaderboard', 'get_season_rewards', 'complete_season_reward',
+    'get_alltime_record', 'get_alltime_rank', 'get_alltime_leaderboard',
+    'load_run_statistics', 'merge_run_statistics',
+    'restore_player', 'run_maintenance_slice'
+)
+
+
+def parse_address(address: Optional[str]) -> Tuple[str, int]:
+    """把 host:port 解析为地址元组，缺省使用 127.0.0.1:25590"""
+    if not address:
+        return DEFAULT_ADDRESS
+    host, _, port = address.rpartition(':')
+    return host or DEFAULT_ADDRESS[0], int(port)
+
+
+class SharedStorageClient(StorageBackend):
+    """
+    共享存储客户端，通过本地socket连接 SharedStorageServer，多个服务器进程可同时使用
+    协议为逐行JSON：请求 {"op": 名称, "args": [...]}，响应 {"ok": bool, "result": ...}
+    游戏设施保存在本服的本地存储中，每个服务器的世界与设施坐标互不影响
+    请求在调用线程（即服务器主线程）上同步执行：共享存储无响应时，第一次请求最多阻塞 timeout 秒，
+    之后 RECONNECT_BACKOFF 秒内的请求直接失败返回默认值，期间结束的游戏不会记录成绩
+    """
+
+    def __init__(self, address: Tuple[str, int], local: StorageBackend, timeout: float = 2.0):
+        """
+        :param address: 共享存储服务地址 (host, port)
+        :param local: 本服的本地存储，保存游戏设施
+        :param timeout: 单次请求超时秒数
+        """
+        self.address = address
+        self.local = local
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.sock: Optional[socket.socket] = None
+        self.reader = None
+        self.retry_after = 0.0
+
+    def init(self) -> None:
+        self.local.init()
+
+    def close(self) -> None:
+        with self.lock:
+            self._disconnect()
+        self.local.close()
+
+    # Facility
+    def save_facility(self, screen_start: tuple, screen_end: tuple, trigger_pos: tuple) -> bool:
+        return self.local.save_facility(screen_start, screen_end, trigger_pos)
+
+    def load_facility(self) -> Optional[Dict[str, Any]]:
+        return self.local.load_facility()
+
+    # Player record
+    def get_player_record(self, xuid: str) -> Optional[PlayerRecord]:
+        result = self._call('get_player_record', xuid)
+        return PlayerRecord(*result) if result else None
+
+    def update_player_record(self, xuid: str, player_name: str, time: float, raw_time: float,
+                             play_date: str) -> Tuple[bool, bool]:
+        result = self._call('update_player_record', xuid, player_name, time, raw_time, play_date, default=(False, False))
+        return bool(result[0]), bool(result[1])
+
+    def save_player_record(self, record: PlayerRecord, run: Optional[PlayerRecord] = None) -> bool:
+        return bool(self._call('save_player_record', record.to_row(), run.to_row() if run is not None else None, default=False))
+
+    def get_player_rank(self, xuid: str) -> Optional[int]:
+        return self._call('get_player_rank', xuid)
+
+    def get_leaderboard(self, limit: int, reverse: bool = False) -> List[Tuple[str, float]]:
+        return [tuple(_) for _ in self._call('get_leaderboard', limit, reverse, default=[])]
+
+    def get_average_time(self) -> Optional[float]:
+        return self._call('get_average_time')
+
+    def import_player_records(self, records: Iterable[PlayerRecord]) -> bool:
+        return bool(self._call('import_player_records', [record.to_row() for record in records], default=False))
+
+    # Season
+    def get_current_season(self) -> Optional[int]:
+        return self._call('get_current_season')
+
+    def close_season(self, rewards: Sequence[int], today: str) -> Optional[int]:
+        return self._call('close_season', list(rewards), today)
+
+    def get_season_leaderboard(self, season_id: int, limit: int) -> List[Tuple[str, float]]:
+        return [tuple(_) for _ in self._call('get_season_leaderboard', season_id, limit, default=[])]
+
+    def get_season_rewards(self, xuid: str) -> List[Tuple[int, int, int, int]]:
+        return [tuple(_) for _ in self._call('get_season_rewards', xuid, default=[])]
+
+    def complete_season_reward(self, reward_id: int) -> bool:
+        return bool(self._call('complete_season_reward', reward_id, default=False))
+
+    def get_alltime_record(self, xuid: str) -> Optional[PlayerRecord]:
+        result = self._call('get_alltime_record', xuid)
+        return PlayerRecord(*result) if result else None
+
+    def get_alltime_rank(self, xuid: str) -> Optional[int]:
+        return self._call('get_alltime_rank', xuid)
+
+    def get_alltime_leaderboard(self, limit: int) -> List[Tuple[str, float]]:
+        return [tuple(_) for _ in self._call('get_alltime_leaderboard', limit, default=[])]
+
+    # Statistics
+    def load_run_statistics(self, keys: Sequence[str]) -> Dict[str, RunStatistics]:
+        result = self._call('load_run_statistics', list(keys), default={})
+        return {key: RunStatistics.decode(data) for key, data in result.items()}
+
+    def merge_run_statistics(self, deltas: Dict[str, RunStatistics]) -> Dict[str, RunStatistics]:
+        result = self._call('merge_run_statistics', {key: stats.encode() for key, stats in deltas.items()}, default={})
+        return {key: RunStatistics.decode(data) for key, data in result.items()}
+
+    # Reward
+    def get_last_play_date(self, xuid: str) -> Optional[str]:
+        return self._call('get_last_play_date', xuid)
+
+    # Maintenance
+    def restore_player(self, xuid: str) -> bool:
+        return bool(self._call('restore_player', xuid, default=False))
+
+    def run_maintenance_slice(self) -> int:
+        # Maintenance is run by the server process, clients never drive it
+        return 0
+
+    def _call(self, op: str, *args, default: Any = None) -> Any:
+        request = (json.dumps({'op': op, 'args': args}) + '\n').encode('utf-8')
+        with self.lock:
+            if time.monotonic() < self.retry_after:
+                return default
+            # Retry once on a fresh connection, the server may have restarted
+            for attempt in range(2):
+                try:
+                    if self.sock is None:
+                        self._connect()
+                    self.sock.sendall(request)
+                    line = self.reader.readline()
+                    if not line:
+                        raise ConnectionError('connection closed by shared storage server')
+                    response = json.loads(line)
+                    if not response.get('ok'):
+                        print(f'[ARC DTWT]Shared storage error on {op}: {response.get("error")}')
+                        return default
+                    return response.get('result')
+                except (OSError, ValueError) as e:
+                    self._disconnect()
+                    # A hung server would only time out again, don't wait twice
+                    if attempt == 1 or isinstance(e, socket.timeout):
+                        print(f'[ARC DTWT]Shared storage unavailable ({op}): {e}, retrying in {RECONNECT_BACKOFF:.0f}s.')
+                        self.retry_after = time.monotonic() + RECONNECT_BACKOFF
+                        break
+        return default
+
+    def _connect(self):
+        self.sock = socket.create_connection(self.address, timeout=self.timeout)
+        self.reader = self.sock.makefile('rb')
+
+    def _disconnect(self):
+        if self.reader is not None:
+            try:
+                self.reader.close()
+            except OSError:
+                pass
+            self.reader = None
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+def is_loopback_address(host: str) -> bool:
+    """主机名解析出的所有地址都是本机回环地址时返回True，空地址（所有网卡）不算"""
+    if not host:
+        return False
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except OSError:
+        return False
+    return all(ipaddress.ip_address(info[4][0].split('%')[0]).is_loopback for info in infos)
+
+
+class SharedStorageServer(socketserver.ThreadingTCPServer):
+    """
+    共享存储服务，把任意 StorageBackend 通过本地socket提供给多个客户端
+    所有请求串行执行，保证同一玩家的成绩提交是原子的
+    协议没有身份验证，能连上端口的任何人都可以写入成绩或结束赛季，因此默认只允许监听回环地址
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], backend: StorageBackend, allow_remote: bool = False):
+        """
+        :param address: 监听地址 (host, port)
+        :param backend: 提供服务的存储后端
+        :param allow_remote: 允许监听非回环地址
+        """
+        if not allow_remote and not is_loopback_address(address[0]):
+            raise ValueError(f'refusing to serve shared storage on non-loopback address {address[0]!r}, '
+                             f'the protocol has no authentication')
+        self.backend = backend
+        self.backend_lock = threading.Lock()
+        super().__init__(address, SharedStorageRequestHandler)
+
+    def handle_operation(self, op: str, args: list) -> Any:
+        if op not in SHARED_OPERATIONS:
+            raise ValueError(f'unknown operation {op}')
+        if op == 'import_player_records':
+            args = [[PlayerRecord(*row) for row in args[0]]]
+        elif op == 'save_player_record':
+            args = [PlayerRecord(*args[0]), PlayerRecord(*args[1]) if len(args) > 1 and args[1] else None]
+        elif op == 'merge_run_statistics':
+            args = [{key: RunStatistics.decode(data) for key, data in args[0].items()}]
+        with self.backend_lock:
+            result = getattr(self.backend, op)(*args)
+        if isinstance(result, PlayerRecord):
+            return result.to_row()
+        if op in ('load_run_statistics', 'merge_run_statistics'):
+            return {key: stats.encode() for key, stats in result.items()}
+        return result
+
+
+class SharedStorageRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = {'ok': True, 'result': self.server.handle_operation(request['op'], request.get('args', []))}
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+        # Release this handler thread's database connection
+        self.server.backend.close()
+
+
+def main():
+    from endstone_arc_dtwt.DatabaseManager import DatabaseManager
+    from endstone_arc_dtwt.MemoryStorage import MemoryStorage
+    from endstone_arc_dtwt.SQLiteStorage import SQLiteStorage
+
+    parser = argparse.ArgumentParser(description="ARC DTWT shared storage server")
+    parser.add_argument('--address', default=f'{DEFAULT_ADDRESS[0]}:{DEFAULT_ADDRESS[1]}', help='host:port to listen on')
+    parser.add_argument('--database', default='DTWTshared.db', help='SQLite file to serve')
+    parser.add_argument('--memory', action='store_true', help='serve an in-memory store instead of SQLite')
+    parser.add_argument('--allow-remote', action='store_true',
+                        help='listen on a non-loopback address; anyone reaching the port can write records, firewall it')
+    args = parser.parse_args()
+
+    address = parse_address(args.address)
+    if not args.allow_remote and not is_loopback_address(address[0]):
+        parser.error(f'{address[0]!r} is not a loopback address, the protocol has no authentication. '
+                     f'Pass --allow-remote to listen on it anyway.')
+    backend = MemoryStorage() if args.memory else SQLiteStorage(DatabaseManager(args.database))
+    backend.init()
+    with SharedStorageServer(address, backend, args.allow_remote) as server:
+        print(f'[ARC DTWT]Shared storage listening on {address[0]}:{address[1]}')
+        # Archive and vacuum in the server process, one slice per second
+        maintenance_stop = threading.Event()
+
+        def maintenance_loop():
+            while not maintenance_stop.wait(1):
+                with server.backend_lock:
+                    backend.run_maintenance_slice()
+        threading.Thread(target=maintenance_loop, daemon=True).start()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            maintenance_stop.set()
+
+
+if __name__ == '__main__':
+    main()
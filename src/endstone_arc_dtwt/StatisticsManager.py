@@ -0,0 +1,103 @@
+import time
+from typing import Dict, Optional
+
+from endstone_arc_dtwt.RunStatistics import RunStatistics
+from endstone_arc_dtwt.StorageBackend import StorageBackend
+
+# Periods kept for the current facility
+PERIOD_ALL = 'all'
+PERIOD_SEASON = 'season'
+PERIOD_DAY = 'day'
+
+
+class StatisticsManager:
+    """
+    增量统计
+    每局结束时把结果累加到当前设施的 全部/本赛季/今日 三个统计维度，从不重新扫描记录表；
+    新增部分先在内存中累积，定时作为增量合并进存储，多个服务器共享存储时互不覆盖
+    """
+
+    def __init__(self, flush_interval: float = 60.0):
+        """
+        :param flush_interval: 两次写回存储之间的最短秒数
+        """
+        self.flush_interval = flush_interval
+        self.scope: Dict[str, str] = {}  # period -> stat key
+        self.totals: Dict[str, RunStatistics] = {}
+        self.pending: Dict[str, RunStatistics] = {}
+        self.recording = True  # False while the season is unknown, runs are not counted anywhere
+        self.last_flush_time = time.monotonic()
+
+    @staticmethod
+    def make_keys(facility_key: str, season_id: Optional[int], today: str) -> Dict[str, str]:
+        return {
+            PERIOD_ALL: f'{facility_key}|all',
+            PERIOD_SEASON: f'{facility_key}|season:{season_id}',
+            PERIOD_DAY: f'{facility_key}|day:{today}'
+        }
+
+    def ensure_scope(self, storage: StorageBackend, facility_key: str, season_id: Optional[int], today: str):
+        """
+        切换到当前设施、赛季与日期对应的统计维度，只在维度变化时读取存储
+        赛季未知（如共享存储无响应）时保留原维度，并暂停记录直到赛季可用
+        """
+        self.recording = season_id is not None
+        if not self.recording:
+            return
+        keys = self.make_keys(facility_key, season_id, today)
+        if keys == self.scope:
+            return
+        self.scope = keys
+        # Totals of old periods are dropped, their pending deltas still reach storage on the next flush
+        self.totals = {key: stats for key, stats in self.totals.items() if key in keys.values()}
+        missing = [key for key in keys.values() if key not in self.totals]
+        if missing:
+            loaded = storage.load_run_statistics(missing)
+            for key in missing:
+                self.totals[key] = loaded.get(key) or RunStatistics()
+
+    def record_run(self, success: bool, time_cost: Optional[float] = None, timeout: bool = False):
+        """
+        记录一局结果
+        :param success: 是否通关
+        :param time_cost: 通关用时
+        :param timeout: 失败是否因为超时
+        """
+        if not self.recording:
+            return
+        for key in self.scope.values():
+            self.totals.setdefault(key, RunStatistics()).record(success, time_cost, timeout)
+            self.pending.setdefault(key, RunStatistics()).record(success, time_cost, timeout)
+
+    def get(self, period: str) -> Optional[RunStatistics]:
+        """
+        :param period: PERIOD_ALL / PERIOD_SEASON / PERIOD_DAY
+        :return: 当前维度的累计统计，未加载返回None
+        """
+        key = self.scope.get(period)
+        return self.totals.get(key) if key is not None else None
+
+    def flush(self, storage: StorageBackend, force: bool = False) -> bool:
+        """
+        把累积的增量合并进存储
+        :param storage: 存储后端
+        :param force: 忽略写回间隔
+        :return: 是否执行了写回
+        """
+        if not self.pending:
+            return False
+        if not force and time.monotonic() - self.last_flush_time < self.flush_interval:
+            return False
+        deltas, self.pending = self.pending, {}
+        self.last_flush_time = time.monotonic()
+        merged = storage.merge_run_statistics(deltas)
+        if not merged:
+            # Keep the deltas for the next attempt
+            for key, delta in deltas.items():
+                self.pending.setdefault(key, RunStatistics()).merge(delta)
+            return False
+        # Stored totals include other servers' runs when storage is shared
+        for key, stats in merged.items():
+            if key in self.totals:
+                self.totals[key] = stats
+        return True
@@ -0,0 +1,239 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+from endstone_arc_dtwt.RunStatistics import RunStatistics
+
+
+class StorageBackend(ABC):
+    """
+    存储后端接口，覆盖游戏设施、玩家记录与奖励状态
+    实现：SQLiteStorage（默认）、MemoryStorage（测试与基准）、SharedStorageClient（多服共享）、CachedStorage（缓存包装）
+    抽象方法缺失的实现在构造时即报错，而不是在游戏中途
+    """
+
+    def init(self) -> None:
+        """初始化存储（建表、连接等）"""
+        pass
+
+    def close(self) -> None:
+        """释放当前线程持有的资源"""
+        pass
+
+    # Facility
+    @abstractmethod
+    def save_facility(self, screen_start: tuple, screen_end: tuple, trigger_pos: tuple) -> bool:
+        """
+        保存游戏设施，替换旧设施
+        :param screen_start: 显示屏起点坐标 (x, y, z)
+        :param screen_end: 显示屏终点坐标 (x, y, z)
+        :param trigger_pos: 触发方块坐标 (x, y, z)
+        :return: 是否保存成功
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_facility(self) -> Optional[Dict[str, Any]]:
+        """
+        读取游戏设施
+        :return: {'screen_start', 'screen_end', 'trigger_pos'} 或None
+        """
+        raise NotImplementedError
+
+    # Player record
+    @abstractmethod
+    def get_player_record(self, xuid: str) -> Optional[PlayerRecord]:
+        """
+        读取玩家记录
+        :param xuid: 玩家XUID
+        :return: 玩家记录或None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_player_record(self, xuid: str, player_name: str, time: float, raw_time: float,
+                             play_date: str) -> Tuple[bool, bool]:
+        """
+        提交一次完成成绩，原子地更新当前赛季最佳纪录、最后游戏日期与历代记录
+        :param xuid: 玩家XUID
+        :param player_name: 玩家名称
+        :param time: 排名用时
+        :param raw_time: 原始用时
+        :param play_date: 游戏日期（ISO格式）
+        :return: (是否更新成功, 是否破纪录)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_player_record(self, record: PlayerRecord, run: Optional[PlayerRecord] = None) -> bool:
+        """
+        写入完整的玩家记录（插入或覆盖），由缓存层在自行合并成绩后调用
+        :param record: 当前赛季的玩家记录
+        :param run: 本局成绩，给出时在同一次写入中并入历代记录
+        :return: 是否写入成功
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_player_rank(self, xuid: str) -> Optional[int]:
+        """
+        获取玩家排名
+        :param xuid: 玩家XUID
+        :return: 玩家排名（从1开始），未找到返回None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_leaderboard(self, limit: int, reverse: bool = False) -> List[Tuple[str, float]]:
+        """
+        获取排行榜
+        :param limit: 获取数量
+        :param reverse: 是否倒序（获取最慢记录）
+        :return: [(玩家名, 用时)] 的列表
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_average_time(self) -> Optional[float]:
+        """
+        获取所有玩家的平均用时
+        :return: 平均用时，无记录返回None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def import_player_records(self, records: Iterable[PlayerRecord]) -> bool:
+        """
+        批量导入玩家记录，已存在的玩家会被覆盖；同时并入历代记录，历代最佳只会变得更好
+        :param records: 玩家记录
+        :return: 是否导入成功
+        """
+        raise NotImplementedError
+
+    # Season
+    @abstractmethod
+    def get_current_season(self) -> Optional[int]:
+        """
+        :return: 当前赛季编号，player_records 相关方法都作用于当前赛季
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close_season(self, rewards: Sequence[int], today: str) -> Optional[int]:
+        """
+        结束当前赛季并开启新赛季，旧赛季记录保留可查
+        :param rewards: 第1名、第2名……的奖励金额，记为待领取奖励
+        :param today: 今天的日期（ISO格式）
+        :return: 被结束的赛季编号，失败返回None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_season_leaderboard(self, season_id: int, limit: int) -> List[Tuple[str, float]]:
+        """
+        获取已结束赛季的排行榜
+        :param season_id: 赛季编号
+        :param limit: 获取数量
+        :return: [(玩家名, 用时)] 的列表，赛季不存在时为空
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_season_rewards(self, xuid: str) -> List[Tuple[int, int, int, int]]:
+        """
+        读取玩家待领取的赛季奖励，奖励在 complete_season_reward 之前一直保留
+        :param xuid: 玩家XUID
+        :return: [(奖励编号, 赛季编号, 名次, 金额)] 的列表
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete_season_reward(self, reward_id: int) -> bool:
+        """
+        发放成功后删除赛季奖励
+        :param reward_id: 奖励编号
+        :return: 是否删除成功
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_alltime_record(self, xuid: str) -> Optional[PlayerRecord]:
+        """
+        读取玩家历代最佳记录
+        :param xuid: 玩家XUID
+        :return: 玩家记录或None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_alltime_rank(self, xuid: str) -> Optional[int]:
+        """
+        获取玩家历代排名
+        :param xuid: 玩家XUID
+        :return: 玩家排名（从1开始），未找到返回None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_alltime_leaderboard(self, limit: int) -> List[Tuple[str, float]]:
+        """
+        获取历代排行榜
+        :param limit: 获取数量
+        :return: [(玩家名, 用时)] 的列表
+        """
+        raise NotImplementedError
+
+    # Statistics
+    @abstractmethod
+    def load_run_statistics(self, keys: Sequence[str]) -> Dict[str, RunStatistics]:
+        """
+        读取统计数据
+        :param keys: 统计维度键
+        :return: {键: 统计}，不存在的键不返回
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def merge_run_statistics(self, deltas: Dict[str, RunStatistics]) -> Dict[str, RunStatistics]:
+        """
+        把增量统计合并进已保存的统计
+        :param deltas: {键: 增量统计}
+        :return: {键: 合并后的统计}，失败返回空字典
+        """
+        raise NotImplementedError
+
+    # Reward
+    def get_last_play_date(self, xuid: str) -> Optional[str]:
+        """
+        获取玩家最后一次完成游戏的日期，用于每日奖励判断
+        应跨赛季读取（如历代记录），否则赛季结束当天玩家会再次获得每日奖励
+        :param xuid: 玩家XUID
+        :return: ISO格式日期或None
+        """
+        record = self.get_alltime_record(xuid)
+        return record.last_play_date if record is not None else None
+
+    # Cache
+    def prefetch_player(self, xuid: str) -> None:
+        """玩家进入服务器时预读记录，无缓存的后端忽略"""
+        pass
+
+    def evict_player(self, xuid: str) -> None:
+        """玩家离开服务器时丢弃缓存，无缓存的后端忽略"""
+        pass
+
+    # Maintenance
+    def restore_player(self, xuid: str) -> bool:
+        """
+        恢复被归档的玩家记录，不支持归档的后端直接返回False
+        :param xuid: 玩家XUID
+        :return: 是否恢复了记录
+        """
+        return False
+
+    def run_maintenance_slice(self) -> int:
+        """
+        执行一小片维护工作，不需要维护的后端直接返回0
+        :return: 本片归档的玩家数量
+        """
+        return 0
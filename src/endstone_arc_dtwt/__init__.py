@@ -1,4 +1,9 @@
-from endstone_arc_dtwt.arc_dtwt_plugin import ARCDTWTPlugin
-
 __all__ = ["ARCDTWTPlugin"]
 
+
+def __getattr__(name):
+    # The plugin needs endstone, storage modules and the shared storage server don't
+    if name == "ARCDTWTPlugin":
+        from endstone_arc_dtwt.arc_dtwt_plugin import ARCDTWTPlugin
+        return ARCDTWTPlugin
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 import math
 import random
+import threading
 import time
 from datetime import datetime, date
 
@@ -8,14 +9,27 @@ from typing import Optional, Dict, Any, List, Tuple
 
 from endstone import ColorFormat, Player
 from endstone.command import Command, CommandSender
-from endstone.event import event_handler, PlayerInteractEvent, BlockBreakEvent
+from endstone.event import event_handler, PlayerInteractEvent, BlockBreakEvent, PlayerJoinEvent, PlayerQuitEvent
 from endstone.plugin import Plugin
 
+from endstone_arc_dtwt.CachedStorage import CachedStorage
 from endstone_arc_dtwt.DatabaseManager import DatabaseManager
+from endstone_arc_dtwt.GameBoard import GameBoard, BOARD_MIN_WIDTH, BOARD_MIN_HEIGHT
+from endstone_arc_dtwt.EventManager import EventManager, EVENT_GAME_STARTED, EVENT_GAME_ENDED, EVENT_PERSONAL_BEST, EVENT_TOP_CHANGED
 from endstone_arc_dtwt.LanguageManager import LanguageManager
+from endstone_arc_dtwt.LeaderboardDisplay import LeaderboardDisplay
+from endstone_arc_dtwt.MemoryStorage import MemoryStorage
+from endstone_arc_dtwt.ProfileManager import ProfileManager
+from endstone_arc_dtwt.RunTimer import RunTimer
+from endstone_arc_dtwt.RenderScheduler import RenderScheduler, PRIORITY_INPUT, PRIORITY_COSMETIC
 from endstone_arc_dtwt.SettingManager import SettingManager
+from endstone_arc_dtwt.StatisticsManager import StatisticsManager, PERIOD_ALL, PERIOD_SEASON, PERIOD_DAY
+from endstone_arc_dtwt.SharedStorage import SharedStorageClient, parse_address
+from endstone_arc_dtwt.SQLiteStorage import SQLiteStorage
+from endstone_arc_dtwt.StorageBackend import StorageBackend
 
 MAIN_PATH = 'plugins/ARCDTWT'
+LEADERBOARD_CACHE_SIZE = 10
 
 class ARCDTWTPlugin(Plugin):
     api_version = "0.7"
@@ -23,37 +37,61 @@ class ARCDTWTPlugin(Plugin):
         "dtwt":
             {
                 "description": "Show description of 'ARC Don't Tap the White Tile' plugin.",
-                "usages": ["/dtwt"],
+                "usages": ["/dtwt", "/dtwt (alltime)<board: DtwtBoard>"],
                 "permissions": ["arc_dtwt.command.dtwt"],
             },
         "createdtwt": {
             "description": "Create a new game facility, will delete the old one if exists.",
             "usages": ["/createdtwt"]
+        },
+        "dtwtprofile": {
+            "description": "Profile this plugin for some seconds, optionally with memory snapshots.",
+            "usages": ["/dtwtprofile <seconds: int> [memory: bool]"],
+            "permissions": ["arc_dtwt.command.dtwtprofile"],
+        },
+        "dtwtseason": {
+            "description": "Show a season leaderboard, or close the current season and pay season rewards.",
+            "usages": ["/dtwtseason", "/dtwtseason <season: int>", "/dtwtseason (close)<action: DtwtSeasonAction>"],
+            "permissions": ["arc_dtwt.command.dtwtseason"],
         }
     }
     permissions = {
         "arc_dtwt.command.dtwt": {
             "description": "Can used by everyone.",
             "default": True,
+        },
+        "arc_dtwt.command.dtwtprofile": {
+            "description": "Only operators can profile the plugin.",
+            "default": "op",
+        },
+        "arc_dtwt.command.dtwtseason": {
+            "description": "Everyone can view ended seasons.",
+            "default": True,
+        },
+        "arc_dtwt.command.dtwtseason.close": {
+            "description": "Only operators can close a season.",
+            "default": "op",
         }
     }
 
     def __init__(self):
         super().__init__()
-        self.setting_manager = SettingManager()
-        default_language_dode = self.setting_manager.GetSetting('DEFAULT_LANGUAGE_CODE')
-        self.language_manager = LanguageManager(default_language_dode if default_language_dode is not None else 'ZH-CN')
-        # database
-        self.db_manager = DatabaseManager(Path(MAIN_PATH) / self.setting_manager.GetSetting('DATABASE_PATH'))
-        self._init_database()
+        # Construction stays cheap: file and database work is deferred to on_enable
+        self.setting_manager = None
+        self.language_manager = None
+        self.storage: Optional[StorageBackend] = None
+        self.maintenance_task = None
 
         # Interact time record dict
         self.interact_time_dict = {}
 
-        # Current Facility
-        self.current_facility = self.get_game_facility()
-        if self.current_facility is not None:
-            print(f'[ARC DTWT]Successfully load game facility, game displayer ({self.current_facility['screen_start']} -> {self.current_facility['screen_end']}), start trigger at {self.current_facility['trigger_pos']}.')
+        # Current Facility, loaded by the warm-up thread
+        self.current_facility = None
+
+        # Leaderboard cache, only written on the main thread and dropped on new records
+        self.leaderboard_cache = None
+        self.leaderboard_generation = 0  # bumped on every drop, stale warm-up results are discarded
+        self.warmup_thread = None
 
         # Deploy new facility function
         self.if_in_deploying_state = False
@@ -63,42 +101,54 @@ class ARCDTWTPlugin(Plugin):
         self.trigger_pos = None
 
         # Game function
-        try:
-            self.total_black_tile_num = int(self.setting_manager.GetSetting('TOTAL_BLACK_TILE_NUM'))
-        except (ValueError, TypeError):
-            self.total_black_tile_num = 20
+        self.total_black_tile_num = 20
         self.if_in_game = False
-        self.game_start_time = None
+        self.run_timer = RunTimer()
+        self.current_tick = 0
         self.player_name = None
-        self.current_display_seq = [None for _ in range(5)]
+        self.board: Optional[GameBoard] = None
         self.current_black_tile_index = 0
+        self.board_max_width = 16
+        self.board_max_height = 16
         # Timeout check
         self.timeout_check_task = None
-        
+
         # Reward settings
-        try:
-            self.daily_reward_amount = int(self.setting_manager.GetSetting('DAILY_REWARD_AMOUNT'))
-        except (ValueError, TypeError):
-            self.daily_reward_amount = 100
-        try:
-            self.first_place_reward = int(self.setting_manager.GetSetting('FIRST_PLACE_REWARD'))
-        except (ValueError, TypeError):
-            self.first_place_reward = 500
-        try:
-            self.second_place_reward = int(self.setting_manager.GetSetting('SECOND_PLACE_REWARD'))
-        except (ValueError, TypeError):
-            self.second_place_reward = 300
-        try:
-            self.third_place_reward = int(self.setting_manager.GetSetting('THIRD_PLACE_REWARD'))
-        except (ValueError, TypeError):
-            self.third_place_reward = 200
-        
+        self.daily_reward_amount = 100
+        self.first_place_reward = 500
+        self.second_place_reward = 300
+        self.third_place_reward = 200
+        self.season_rewards = [20000, 10000, 5000]
+
         self.economy_plugin = None
 
+        # Render, block updates are spread across ticks under a budget
+        self.render_scheduler = RenderScheduler(self.dispatch_fill)
+        self.render_task = None
+        self.attract_mode_interval = 0
+        self.attract_task = None
+
+        # In-world leaderboard, redrawn only when the visible top N changes
+        self.leaderboard_display = LeaderboardDisplay(self.dispatch_console_command)
+        self.top_snapshot = None
+
+        # Events for other plugins, delivered in batches after each tick
+        self.event_manager = EventManager()
+
+        # Profiling, nothing is hooked until /dtwtprofile is used
+        self.profile_manager = ProfileManager()
+        self.profile_stop_task = None
+
+        # Run statistics, accumulated per game and merged into storage in the maintenance task
+        self.statistics_manager = StatisticsManager()
+
     def on_load(self) -> None:
         self.logger.info(f"{ColorFormat.YELLOW}[ARC DTWT]Plugin loaded!")
 
     def on_enable(self) -> None:
+        enable_start = time.perf_counter()
+        self.run_startup_phase('settings', self._init_settings)
+        self.run_startup_phase('storage', self._init_storage)
         self.register_events(self)
 
         # Initialize economy plugin - check arc_core first, then umoney
@@ -115,9 +165,27 @@ class ARCDTWTPlugin(Plugin):
         except Exception as e:
             print(f"[ARC DTWT]Failed to load economy plugin: {e}. Money rewards will not be available.")
 
-        self.logger.info(f"{ColorFormat.YELLOW}[ARC DTWT]Plugin enabled!")
+        self.render_task = self.server.scheduler.run_task(self, self.on_server_tick, delay=1, period=1)
+        self.maintenance_task = self.server.scheduler.run_task(self, self.run_maintenance_slice, delay=20 * 60, period=20)
+        self.server.scheduler.run_task(self, self.setup_leaderboard_display, delay=20)
+        if self.attract_mode_interval > 0:
+            self.attract_task = self.server.scheduler.run_task(self, self.play_attract_animation,
+                                                               delay=self.attract_mode_interval * 20,
+                                                               period=self.attract_mode_interval * 20)
+
+        # Preload caches in background so the first player doesn't pay for them
+        self.warmup_thread = threading.Thread(target=self.warm_up_caches, name='ARCDTWT-WarmUp', daemon=True)
+        self.warmup_thread.start()
+
+        self.logger.info(f"{ColorFormat.YELLOW}[ARC DTWT]Plugin enabled in {(time.perf_counter() - enable_start) * 1000:.1f} ms!")
 
     def on_disable(self) -> None:
+        self.event_manager.close()
+        if self.profile_manager.is_running:
+            self.stop_profiling()
+        if self.storage is not None:
+            self.statistics_manager.flush(self.storage, force=True)
+            self.storage.close()
         self.logger.info(f"{ColorFormat.YELLOW}[ARC DTWT]Plugin disabled!")
 
     def on_command(self, sender: CommandSender, command: Command, args: list[str]) -> bool:
@@ -125,12 +193,18 @@ class ARCDTWTPlugin(Plugin):
             if not isinstance(sender, Player):
                 sender.send_message(f'[ARC DTWT]This command only works for players.')
                 return True
+            if len(args) > 0 and args[0].lower() == 'alltime':
+                self.show_alltime_standings(sender)
+                return True
             best_three_record = self.get_leaderboard(3)
             top1_record = 'null-∞' if len(best_three_record) < 1 else f'{best_three_record[0][0]}-{round(best_three_record[0][1], 3)} '
             top2_record = 'null-∞' if len(best_three_record) < 2 else f'{best_three_record[1][0]}-{round(best_three_record[1][1], 3)} '
             top3_record = 'null-∞' if len(best_three_record) < 3 else f'{best_three_record[2][0]}-{round(best_three_record[2][1], 3)} '
             sender_player = self.server.get_player(sender.name)
             if sender_player is not None:
+                if self.storage.restore_player(sender_player.xuid):
+                    self.invalidate_leaderboard_cache()
+                    self.refresh_leaderboard()
                 sender_record = self.get_player_best_time(sender_player.xuid)
                 if sender_record is None:
                     sender_record = '∞'
@@ -143,6 +217,10 @@ class ARCDTWTPlugin(Plugin):
                 sender_record = '∞'
                 sender_rank = '∞'
             sender.send_message(self.language_manager.GetText('DTWT_DESCRIPTION').replace('\\n', '\n').format(self.total_black_tile_num, top1_record, top2_record, top3_record, sender_record, sender_rank))
+            current_season = self.storage.get_current_season()
+            if current_season is not None:
+                sender.send_message(self.language_manager.GetText('DTWT_CURRENT_SEASON_MESSAGE').format(current_season))
+            self.show_statistics(sender, None if sender_record == '∞' else sender_record)
             return True
         if command.name == "createdtwt":
             if not isinstance(sender, Player):
@@ -156,6 +234,55 @@ class ARCDTWTPlugin(Plugin):
             else:
                 sender.send_message(self.language_manager.GetText('DTWT_HAS_ANOTHER_CREATOR_MESSAGE'))
             return True
+        if command.name == "dtwtprofile":
+            if self.profile_manager.is_running:
+                sender.send_message(f'[ARC DTWT]Profiler is already running.')
+                return True
+            try:
+                seconds = int(args[0])
+            except (IndexError, ValueError):
+                sender.send_message(f'[ARC DTWT]Usage: /dtwtprofile <seconds> [memory]')
+                return True
+            if seconds <= 0:
+                sender.send_message(f'[ARC DTWT]Profiling duration must be positive.')
+                return True
+            with_memory = len(args) > 1 and args[1].lower() in ('true', '1', 'memory')
+            if not self.profile_manager.start(with_memory):
+                sender.send_message(f'[ARC DTWT]Failed to start profiler, see console for details.')
+                return True
+            self.profile_stop_task = self.server.scheduler.run_task(
+                self,
+                lambda: self.stop_profiling(),
+                delay=seconds * 20
+            )
+            sender.send_message(f'[ARC DTWT]Profiling for {seconds} seconds{' with memory snapshots' if with_memory else ''}...')
+            return True
+        if command.name == "dtwtseason":
+            if len(args) > 0 and args[0].lower() == 'close':
+                if not sender.has_permission('arc_dtwt.command.dtwtseason.close'):
+                    sender.send_message(f'[ARC DTWT]Only operators can close a season.')
+                    return True
+                self.close_season(sender)
+                return True
+            current_season = self.storage.get_current_season()
+            if len(args) == 0:
+                if current_season is None:
+                    sender.send_message(f'[ARC DTWT]Season storage is unavailable, try again later.')
+                    return True
+                sender.send_message(f'[ARC DTWT]Season {current_season} is running. Use /dtwtseason <season> to view an ended season.')
+                return True
+            try:
+                season_id = int(args[0])
+            except ValueError:
+                sender.send_message(f'[ARC DTWT]Usage: /dtwtseason [season|close]')
+                return True
+            leaderboard = self.storage.get_season_leaderboard(season_id, LEADERBOARD_CACHE_SIZE)
+            if not leaderboard:
+                sender.send_message(f'[ARC DTWT]Season {season_id} has not ended or has no records.')
+                return True
+            lines = '\n'.join(f'{i}.{name}-{round(best, 3)}' for i, (name, best) in enumerate(leaderboard, start=1))
+            sender.send_message(self.language_manager.GetText('DTWT_SEASON_LEADERBOARD').replace('\\n', '\n').format(season_id, lines))
+            return True
         return False
 
     @event_handler
@@ -174,32 +301,26 @@ class ARCDTWTPlugin(Plugin):
                     return
                 if self.screen_end is None:
                     possible_end_corner = (event.block.location.x, event.block.location.y, event.block.location.z)
-                    # Judge if a 4 x 5 displayer
+                    # Judge the displayer size
                     if self.screen_start[0] == possible_end_corner[0]:
-                        # Width is supposed to be 4
-                        if math.fabs(self.screen_start[2] - possible_end_corner[2]) != 3:
-                            event.player.send_message(self.language_manager.GetText('DTWT_CREATE_WRONG_DISPLAYER_WIDTH_MESSAGE'))
-                            return
-                        # Height = 5?
-                        if possible_end_corner[1] - self.screen_start[1] != 4:
-                            event.player.send_message(self.language_manager.GetText('DTWT_CREATE_WRONG_DISPLAYER_HEIGHT_MESSAGE'))
-                            return
+                        width = int(math.fabs(self.screen_start[2] - possible_end_corner[2])) + 1
                     elif self.screen_start[2] == possible_end_corner[2]:
-                        # Width is supposed to be 4
-                        if math.fabs(self.screen_start[0] - possible_end_corner[0]) != 3:
-                            event.player.send_message(self.language_manager.GetText('DTWT_CREATE_WRONG_DISPLAYER_WIDTH_MESSAGE'))
-                            return
-                        # Height = 5?
-                        if possible_end_corner[1] - self.screen_start[1] != 4:
-                            event.player.send_message(self.language_manager.GetText('DTWT_CREATE_WRONG_DISPLAYER_HEIGHT_MESSAGE'))
-                            return
+                        width = int(math.fabs(self.screen_start[0] - possible_end_corner[0])) + 1
                     else:
                         event.player.send_message(self.language_manager.GetText('DTWT_CREATE_DISPLAYER_NOT_A_PLANE_ERROR_MESSAGE'))
                         return
+                    if not BOARD_MIN_WIDTH <= width <= self.board_max_width:
+                        event.player.send_message(self.language_manager.GetText('DTWT_CREATE_WRONG_DISPLAYER_WIDTH_MESSAGE').format(BOARD_MIN_WIDTH, self.board_max_width))
+                        return
+                    # The end corner is the top one, height counts both corner rows
+                    height = possible_end_corner[1] - self.screen_start[1] + 1
+                    if not BOARD_MIN_HEIGHT <= height <= self.board_max_height:
+                        event.player.send_message(self.language_manager.GetText('DTWT_CREATE_WRONG_DISPLAYER_HEIGHT_MESSAGE').format(BOARD_MIN_HEIGHT, self.board_max_height))
+                        return
                     self.screen_end = possible_end_corner
                     # display green screen
                     # f'fill {' '.join([str(_) for _ in self.screen_start])} {' '.join([str(_) for _ in self.screen_end])} lime_wool'
-                    self.server.dispatch_command(self.server.command_sender, self.get_fill_command(self.screen_start, self.screen_end, 'green_wool'))
+                    self.render_scheduler.submit([(self.screen_start, self.screen_end, 'green_wool')], PRIORITY_COSMETIC)
                     event.player.send_message(self.language_manager.GetText('DTWT_CREATE_DISPLAYER_END_CORNER_SET_MESSAGE').format(self.screen_end))
                     event.player.send_message(self.language_manager.GetText('DTWT_CREATE_HINT3'))
                     return
@@ -210,10 +331,10 @@ class ARCDTWTPlugin(Plugin):
                     if not s:
                         self.logger.error(f'[ARC DTWT]An error occurred while saving game facility to database.')
                     else:
+                        self.current_facility = self.get_game_facility()
                         self.display_single_color('white')
                         event.player.send_message(self.language_manager.GetText('DTWT_CREATE_HINT4'))
                         self.server.broadcast_message(self.language_manager.GetText('DTWT_CREATE_COMPLETED_BROADCAST').format(self.trigger_pos))
-                        self.current_facility = self.get_game_facility()
                     self.clear_deployment_memory()
                     return
             else:
@@ -229,22 +350,36 @@ class ARCDTWTPlugin(Plugin):
             if screen_pos[1] != 0:
                 event.player.send_message(self.language_manager.GetText('DTWT_PLAYER_CLICKED_WRONG_ROW_MESSGAE'))
                 return
-            if screen_pos[0] == self.current_display_seq[0]:
+            # The board is still being drawn, the run has not started
+            if not self.run_timer.is_running:
+                return
+            if screen_pos[0] == self.board.bottom():
+                self.run_timer.record_tap(self.current_tick)
                 self.current_black_tile_index += 1
                 if self.current_black_tile_index == self.total_black_tile_num:
                     self.end_game(True, event.player)
                     return
-                new_seq = self.current_display_seq[1:]
-                if self.current_black_tile_index + 5 > self.total_black_tile_num:
-                    new_seq.append(None)
+                # Rows past the last black tile are finish rows
+                if self.current_black_tile_index + self.board.height > self.total_black_tile_num:
+                    self.board.advance(None)
                 else:
-                    new_seq.append(random.randint(0, 3))
-                self.displayer_game_update(new_seq)
+                    self.board.advance(random.randint(0, self.board.width - 1))
+                self.displayer_game_update()
             else:
                 self.end_game(False, event.player)
             return
         return
 
+    @event_handler
+    def on_player_join(self, event: PlayerJoinEvent):
+        # Warm the record cache so the first game end does not wait on the database
+        self.storage.prefetch_player(event.player.xuid)
+        self.pay_season_rewards(event.player)
+
+    @event_handler
+    def on_player_quit(self, event: PlayerQuitEvent):
+        self.storage.evict_player(event.player.xuid)
+
     @event_handler
     def on_block_breaked(self, event: BlockBreakEvent):
         if self.current_facility is not None:
@@ -265,6 +400,161 @@ class ARCDTWTPlugin(Plugin):
                     return
                 return
 
+    # Startup
+    @staticmethod
+    def run_startup_phase(phase_name: str, func) -> Any:
+        """
+        执行并计时一个启动阶段
+        :param phase_name: 阶段名称
+        :param func: 阶段执行函数
+        :return: 阶段函数的返回值
+        """
+        phase_start = time.perf_counter()
+        result = func()
+        print(f'[ARC DTWT]Startup phase "{phase_name}" finished in {(time.perf_counter() - phase_start) * 1000:.1f} ms.')
+        return result
+
+    def _init_settings(self):
+        """加载配置文件与默认语言，解析游戏与奖励设置"""
+        self.setting_manager = SettingManager()
+        default_language_dode = self.setting_manager.GetSetting('DEFAULT_LANGUAGE_CODE')
+        self.language_manager = LanguageManager(default_language_dode if default_language_dode is not None else 'ZH-CN')
+
+        try:
+            self.total_black_tile_num = int(self.setting_manager.GetSetting('TOTAL_BLACK_TILE_NUM'))
+        except (ValueError, TypeError):
+            self.total_black_tile_num = 20
+        try:
+            self.board_max_width = max(BOARD_MIN_WIDTH, int(self.setting_manager.GetSetting('BOARD_MAX_WIDTH')))
+        except (ValueError, TypeError):
+            self.board_max_width = 16
+        try:
+            self.board_max_height = max(BOARD_MIN_HEIGHT, int(self.setting_manager.GetSetting('BOARD_MAX_HEIGHT')))
+        except (ValueError, TypeError):
+            self.board_max_height = 16
+        try:
+            self.daily_reward_amount = int(self.setting_manager.GetSetting('DAILY_REWARD_AMOUNT'))
+        except (ValueError, TypeError):
+            self.daily_reward_amount = 100
+        try:
+            self.first_place_reward = int(self.setting_manager.GetSetting('FIRST_PLACE_REWARD'))
+        except (ValueError, TypeError):
+            self.first_place_reward = 500
+        try:
+            self.second_place_reward = int(self.setting_manager.GetSetting('SECOND_PLACE_REWARD'))
+        except (ValueError, TypeError):
+            self.second_place_reward = 300
+        try:
+            self.third_place_reward = int(self.setting_manager.GetSetting('THIRD_PLACE_REWARD'))
+        except (ValueError, TypeError):
+            self.third_place_reward = 200
+        try:
+            self.season_rewards = [int(_) for _ in self.setting_manager.GetSetting('SEASON_REWARDS').split(',') if _.strip()]
+        except (ValueError, TypeError, AttributeError):
+            self.season_rewards = [20000, 10000, 5000]
+        try:
+            self.render_scheduler.block_budget_per_tick = max(1, int(self.setting_manager.GetSetting('RENDER_BLOCK_BUDGET_PER_TICK')))
+        except (ValueError, TypeError):
+            self.render_scheduler.block_budget_per_tick = 20
+        try:
+            self.attract_mode_interval = int(self.setting_manager.GetSetting('ATTRACT_MODE_INTERVAL'))
+        except (ValueError, TypeError):
+            self.attract_mode_interval = 0
+        try:
+            self.leaderboard_display.size = min(int(self.setting_manager.GetSetting('LEADERBOARD_DISPLAY_SIZE')), LEADERBOARD_CACHE_SIZE)
+        except (ValueError, TypeError):
+            self.leaderboard_display.size = 0
+        try:
+            self.leaderboard_display.recent_num = int(self.setting_manager.GetSetting('LEADERBOARD_RECENT_NUM'))
+        except (ValueError, TypeError):
+            self.leaderboard_display.recent_num = 3
+
+    def _init_storage(self):
+        """按配置创建存储后端并初始化"""
+        backend_name = (self.setting_manager.GetSetting('STORAGE_BACKEND') or 'sqlite').lower()
+        if backend_name == 'memory':
+            self.storage = MemoryStorage()
+        elif backend_name == 'shared':
+            try:
+                shared_storage_timeout = float(self.setting_manager.GetSetting('SHARED_STORAGE_TIMEOUT'))
+            except (ValueError, TypeError):
+                shared_storage_timeout = 2.0
+            # Each server keeps its own world, so the facility stays in the local database
+            local_storage = SQLiteStorage(DatabaseManager(Path(MAIN_PATH) / self.setting_manager.GetSetting('DATABASE_PATH')), 0)
+            self.storage = SharedStorageClient(parse_address(self.setting_manager.GetSetting('SHARED_STORAGE_ADDRESS')),
+                                               local_storage, shared_storage_timeout)
+        else:
+            try:
+                archive_inactive_days = int(self.setting_manager.GetSetting('ARCHIVE_INACTIVE_DAYS'))
+            except (ValueError, TypeError):
+                archive_inactive_days = 180
+            try:
+                maintenance_interval = int(self.setting_manager.GetSetting('MAINTENANCE_INTERVAL'))
+            except (ValueError, TypeError):
+                maintenance_interval = 3600
+            convert_to_incremental_vacuum = (self.setting_manager.GetSetting('VACUUM_CONVERT_ON_STARTUP') or 'false').lower() == 'true'
+            db_manager = DatabaseManager(Path(MAIN_PATH) / self.setting_manager.GetSetting('DATABASE_PATH'))
+            self.storage = SQLiteStorage(db_manager, archive_inactive_days, maintenance_interval, convert_to_incremental_vacuum)
+        try:
+            player_cache_size = int(self.setting_manager.GetSetting('PLAYER_CACHE_SIZE'))
+        except (ValueError, TypeError):
+            player_cache_size = 256
+        # Shared records change under other servers, caching them here would serve stale bests
+        if player_cache_size > 0 and backend_name != 'shared':
+            self.storage = CachedStorage(self.storage, player_cache_size)
+        self.storage.init()
+        print(f'[ARC DTWT]Using {type(self.storage).__name__} storage backend.')
+
+    def warm_up_caches(self):
+        """后台预加载游戏设施、排行榜与语言文件，在首位玩家进入前完成；结果交给主线程发布"""
+        warmup_start = time.perf_counter()
+        try:
+            facility = self.run_startup_phase('warm-up facility', self.get_game_facility)
+            if facility is not None:
+                print(f'[ARC DTWT]Successfully load game facility, game displayer ({facility['screen_start']} -> {facility['screen_end']}), start trigger at {facility['trigger_pos']}.')
+            generation = self.leaderboard_generation
+            leaderboard = self.run_startup_phase('warm-up leaderboard', lambda: self.storage.get_leaderboard(LEADERBOARD_CACHE_SIZE))
+            self.server.scheduler.run_task(self, lambda: self.publish_warm_up(facility, leaderboard, generation))
+            self.run_startup_phase('warm-up language catalogs', self.language_manager.PreloadAll)
+        except Exception as e:
+            print(f'[ARC DTWT]Cache warm-up failed: {e}')
+        finally:
+            # Connection is thread local, release the warm-up thread's one
+            self.storage.close()
+        print(f'[ARC DTWT]Cache warm-up finished in {(time.perf_counter() - warmup_start) * 1000:.1f} ms.')
+
+    def publish_warm_up(self, facility: Optional[Dict[str, Any]], leaderboard: List[Tuple[str, float]], generation: int):
+        """
+        在主线程发布预加载结果，预加载期间已变化的数据不被覆盖
+        :param facility: 预加载的游戏设施
+        :param leaderboard: 预加载的排行榜
+        :param generation: 开始读取排行榜时的缓存代数
+        """
+        # Don't overwrite a facility created while warming up
+        if self.current_facility is None:
+            self.current_facility = facility
+        # A record set while the warm-up was reading makes its leaderboard stale
+        if self.leaderboard_cache is None and generation == self.leaderboard_generation:
+            self.leaderboard_cache = leaderboard
+        self.refresh_leaderboard()
+
+    # Profile
+    def stop_profiling(self):
+        """结束性能分析并输出报告路径"""
+        if self.profile_stop_task is not None:
+            try:
+                self.profile_stop_task.cancel()
+            except:
+                pass
+            self.profile_stop_task = None
+        result = self.profile_manager.stop()
+        if result is None:
+            return
+        profile_path, memory_path = result
+        self.logger.info(f'[ARC DTWT]Profile saved to {profile_path}.')
+        if memory_path is not None:
+            self.logger.info(f'[ARC DTWT]Allocation diff saved to {memory_path}.')
+
     # Deploy
     def clear_deployment_memory(self):
         self.if_in_deploying_state = False
@@ -275,9 +565,36 @@ class ARCDTWTPlugin(Plugin):
 
     # Game
     def start_game(self, player_name: str):
+        # Only reads storage on the first game of a day, season or facility, before the timer starts
+        self.ensure_statistics_scope()
         self.if_in_game = True
         self.player_name = player_name
-        self.game_start_time = time.time()
+        self.event_manager.emit(EVENT_GAME_STARTED, {'player_name': player_name, 'tick': self.current_tick})
+
+        # Drop leftover end / attract animations, the first frame redraws the whole screen
+        self.render_scheduler.clear_cosmetic()
+
+        # Random generate the first screen of rows
+        width, height = self.get_board_size()
+        self.board = GameBoard(width, height)
+        start_seq = []
+        for _ in range(height):
+            seed = int(time.time()) + _
+            rg = random.Random(seed)
+            start_seq.append(rg.randint(0, width - 1) if _ < self.total_black_tile_num else None)
+        self.board.reset(start_seq)
+        # Large boards take several ticks to draw under the budget, the run starts once the player can see it
+        board = self.board
+        self.displayer_game_update(lambda: self.start_run_timer(board))
+
+    def start_run_timer(self, board: GameBoard):
+        """
+        第一帧盘面全部绘制完成后开始计时，并开始30秒超时检查
+        :param board: 开局时的盘面，游戏已结束或已换局时忽略
+        """
+        if not self.if_in_game or self.board is not board or self.run_timer.is_running:
+            return
+        self.run_timer.start(self.current_tick)
 
         # Set 30 seconds timeout
         self.timeout_check_task = self.server.scheduler.run_task(
@@ -286,52 +603,90 @@ class ARCDTWTPlugin(Plugin):
             delay=30 * 20  # 30秒后强制结束游戏（转换为游戏tick，1秒=20tick）
         )
 
-        # Random generate first 5 rows
-        start_seq = []
-        for _ in range(5):
-            seed = int(time.time()) + _
-            rg = random.Random(seed)
-            start_seq.append(rg.randint(0, 3))
-        self.displayer_game_update(start_seq)
-
-    def end_game(self, if_successful: bool, player: Player):
+    def end_game(self, if_successful: bool, player: Player, if_timeout: bool = False):
+        timing = self.run_timer.stop(self.current_tick)
         if if_successful:
             # Set displayer color
-            self.display_single_color('lime')
-            # Update record and check for rewards
-            time_cost = time.time() - self.game_start_time
+            self.play_end_animation('lime')
+            # Update record and check for rewards, ranking uses lag compensated time
+            time_cost = timing.compensated_time
+            if timing.lag_ns > 0:
+                self.logger.info(f'[ARC DTWT]Run of {player.name}: raw {timing.raw_time:.3f}s, server lag {timing.lag_time:.3f}s '
+                                 f'over {timing.ticks} ticks, recorded {time_cost:.3f}s.')
+            self.statistics_manager.record_run(True, time_cost)
             
+            # Bring back archived record before any lookup
+            if self.storage.restore_player(player.xuid):
+                self.invalidate_leaderboard_cache()
+                self.refresh_leaderboard()
+
             # Check daily reward before updating record
             can_get_daily_reward = self.can_receive_daily_reward(player.xuid)
             
             # Update player record
-            update_success, is_new_record = self.update_player_record(player.xuid, player.name, time_cost)
+            update_success, is_new_record = self.update_player_record(player.xuid, player.name, time_cost, timing.raw_time)
             
             # Give daily reward if eligible
             if can_get_daily_reward:
                 self.give_money_to_player(player, self.daily_reward_amount, "每日首次完成")
             
             # Check for rank reward if it's a new record
+            new_rank = None
             if is_new_record:
+                self.refresh_leaderboard((player.name, time_cost))
                 new_rank = self.get_player_rank(player.xuid)
+                self.event_manager.emit(EVENT_PERSONAL_BEST, {
+                    'xuid': player.xuid,
+                    'player_name': player.name,
+                    'time': time_cost,
+                    'raw_time': timing.raw_time,
+                    'rank': new_rank,
+                    'tick': self.current_tick
+                })
                 if new_rank is not None and new_rank <= 3:
                     self.check_and_give_rank_reward(player, new_rank)
             
+            self.event_manager.emit(EVENT_GAME_ENDED, {
+                'xuid': player.xuid,
+                'player_name': player.name,
+                'success': True,
+                'timeout': False,
+                'time': time_cost,
+                'raw_time': timing.raw_time,
+                'lag_time': timing.lag_time,
+                'taps': timing.get_tap_times(),
+                'tick': self.current_tick
+            })
+
             # Broadcast
+            if new_rank is None:
+                new_rank = self.get_player_rank(player.xuid)
+            best_time = self.get_player_best_time(player.xuid)
             self.server.broadcast_message(self.language_manager.GetText('DTWT_PLAYER_WIN_BROADCAST').format(player.name,
                                                                                                             round(time_cost, 3),
-                                                                                                            round(self.get_player_best_time(player.xuid), 3),
-                                                                                                            self.get_player_rank(player.xuid)))
+                                                                                                            round(best_time if best_time is not None else time_cost, 3),
+                                                                                                            new_rank))
         else:
             # Set displayer color
-            self.display_single_color('red')
+            self.play_end_animation('red')
+            self.statistics_manager.record_run(False, timeout=if_timeout)
+            self.event_manager.emit(EVENT_GAME_ENDED, {
+                'xuid': player.xuid,
+                'player_name': player.name,
+                'success': False,
+                'timeout': if_timeout,
+                'time': None,
+                'raw_time': None,
+                'lag_time': None,
+                'taps': timing.get_tap_times() if timing is not None else [],
+                'tick': self.current_tick
+            })
             # Broadcast
             self.server.broadcast_message(self.language_manager.GetText('DTWT_PLAYER_GAME_OVER_BROADCAST').format(player.name))
         # clear game memory
         self.if_in_game = False
         self.player_name = None
-        self.game_start_time = None
-        self.current_display_seq = [None for _ in range(5)]
+        self.board = None
         self.current_black_tile_index = 0
         # Cancel timeout check task if exists
         if self.timeout_check_task is not None:
@@ -343,18 +698,34 @@ class ARCDTWTPlugin(Plugin):
 
     def check_game_timeout(self):
         """30秒超时强制结束游戏"""
-        if not self.if_in_game or self.game_start_time is None:
+        if not self.if_in_game or not self.run_timer.is_running:
             return
         
         # 30秒到了，强制结束游戏
         player = self.server.get_player(self.player_name)
         if player is not None:
             player.send_message(self.language_manager.GetText('DTWT_GAME_TIMEOUT_MESSAGE'))
-            self.end_game(False, player)
+            self.end_game(False, player, if_timeout=True)
+
+    def run_maintenance_slice(self):
+        """每秒执行一小片数据库维护，游戏进行中跳过"""
+        if self.if_in_game:
+            return
+        self.statistics_manager.flush(self.storage)
+        if self.storage.run_maintenance_slice() > 0:
+            self.invalidate_leaderboard_cache()
+            self.refresh_leaderboard()
+
+    def on_server_tick(self):
+        """每tick执行：推进tick计数、采样计时延迟、分发屏幕更新"""
+        self.current_tick += 1
+        self.run_timer.on_tick(self.current_tick)
+        self.render_scheduler.on_tick()
+        self.event_manager.flush()
 
     # Avoid interact jitter
     def check_if_valid_click(self, player_name: str) -> bool:
-        current_time = time.time()
+        current_time = time.monotonic()
         _ = not player_name in self.interact_time_dict or (current_time - self.interact_time_dict[player_name]) > 0.125
         if _:
             self.interact_time_dict[player_name] = current_time
@@ -362,59 +733,131 @@ class ARCDTWTPlugin(Plugin):
         else:
             return False
 
+    # Leaderboard display
+    def dispatch_console_command(self, command_line: str):
+        self.server.dispatch_command(self.server.command_sender, command_line)
+
+    def setup_leaderboard_display(self):
+        if self.leaderboard_display.enabled:
+            title = self.language_manager.GetText('DTWT_LEADERBOARD_TITLE') or 'DTWT'
+            self.leaderboard_display.setup(title)
+        self.refresh_leaderboard()
+
+    def refresh_leaderboard(self, breaker: Optional[Tuple[str, float]] = None):
+        """
+        排行榜可能变化时调用，前N名真正变化时才通知订阅者并重绘侧边栏
+        :param breaker: 刚刷新个人纪录的玩家 (玩家名, 用时)
+        """
+        # A new personal best slower than the last place can't change the top N
+        if (breaker is not None and self.top_snapshot is not None and len(self.top_snapshot) >= LEADERBOARD_CACHE_SIZE
+                and breaker[1] >= self.top_snapshot[-1][1]
+                and breaker[0] not in [_[0] for _ in self.top_snapshot]):
+            return
+        # Published as a tuple, other threads read it without a lock
+        new_top = tuple(self.get_leaderboard(LEADERBOARD_CACHE_SIZE))
+        if new_top == self.top_snapshot:
+            return
+        self.top_snapshot = new_top
+        self.event_manager.emit(EVENT_TOP_CHANGED, {'leaderboard': list(new_top), 'tick': self.current_tick})
+        self.leaderboard_display.update(new_top, breaker)
+
     # Displayer
-    def display_single_color(self, color: str):
+    def dispatch_fill(self, pos1: tuple, pos2: tuple, block_name: str):
+        self.server.dispatch_command(self.server.command_sender, self.get_fill_command(pos1, pos2, block_name))
+
+    def get_single_color_frame(self, color: str) -> list:
+        """整屏单色画面，按行拆分以便分摊到多个tick"""
+        if self.get_tile_world_pos(0, 0) is None:
+            return []
+        width, height = self.get_board_size()
+        return [(self.get_tile_world_pos(row, 0), self.get_tile_world_pos(row, width - 1), f'{color}_wool') for row in range(height)]
+
+    def display_single_color(self, color: str, priority: int = PRIORITY_COSMETIC):
         # lime white red
         if self.current_facility is not None:
-            self.server.dispatch_command(self.server.command_sender,
-                                         self.get_fill_command(self.current_facility['screen_start'], self.current_facility['screen_end'], f'{color}_wool'))
-            # f'fill {' '.join([str(_) for _ in self.current_facility['screen_start']])} {' '.join([str(_) for _ in self.current_facility['screen_end']])} {color}_wool'
-
-    def displayer_game_update(self, new_seq: list):
-        for _ in range(5):
-            self.displayer_line_update(_, self.current_display_seq[_], new_seq[_])
-        self.current_display_seq = new_seq
-
-    def displayer_line_update(self, row: int, current_black_tile_pos: int, new_black_tile_pos: int):
-        if new_black_tile_pos is None:
-            for c in range(4):
-                self.displayer_tile_update(row, c, 'green')
+            self.render_scheduler.submit(self.get_single_color_frame(color), priority)
+
+    def play_end_animation(self, color: str):
+        """游戏结束动画：闪烁结果颜色，停留后自上而下擦除为白色"""
+        if self.current_facility is None:
             return
+        result_frame = self.get_single_color_frame(color)
+        if not result_frame:
+            return
+        white_frame = self.get_single_color_frame('white')
+        frames = [(0, result_frame)]
+        for _ in range(2):
+            frames.append((4, white_frame))
+            frames.append((4, result_frame))
+        # Reset wipe, one row per frame from top to bottom
+        for index, row in enumerate(range(len(white_frame) - 1, -1, -1)):
+            frames.append((40 if index == 0 else 2, [white_frame[row]]))
+        self.render_scheduler.submit_animation(frames)
+
+    def play_attract_animation(self):
+        """待机动画：空闲时一个黑块从顶部落到底部"""
+        if self.current_facility is None or self.if_in_game or not self.render_scheduler.is_idle:
+            return
+        if self.get_tile_world_pos(0, 0) is None:
+            return
+        width, height = self.get_board_size()
+        column = random.randint(0, width - 1)
+        frames = []
+        for row in range(height - 1, -1, -1):
+            frame = [(self.get_tile_world_pos(row, column), self.get_tile_world_pos(row, column), 'black_wool')]
+            if row < height - 1:
+                frame.append((self.get_tile_world_pos(row + 1, column), self.get_tile_world_pos(row + 1, column), 'white_wool'))
+            frames.append((0 if row == height - 1 else 3, frame))
+        frames.append((3, [(self.get_tile_world_pos(0, column), self.get_tile_world_pos(0, column), 'white_wool')]))
+        self.render_scheduler.submit_animation(frames)
+
+    def displayer_game_update(self, on_dispatched=None):
+        """
+        把盘面上变化的方块作为一帧提交，同一行相邻同色的方块合并为一条fill
+        :param on_dispatched: 这一帧全部绘制后调用
+        """
+        frame = []
+        for row, start_column, end_column, color in self.board.drain_changes():
+            start_pos = self.get_tile_world_pos(row, start_column)
+            if start_pos is None:
+                break
+            end_pos = start_pos if end_column == start_column else self.get_tile_world_pos(row, end_column)
+            frame.append((start_pos, end_pos, f'{color}_wool'))
+        self.render_scheduler.submit(frame, PRIORITY_INPUT, on_dispatched=on_dispatched)
+
+    def get_board_size(self) -> Tuple[int, int]:
+        """
+        由游戏设施的两个角计算盘面大小
+        :return: (列数, 行数)
+        """
+        screen_start = self.current_facility['screen_start']
+        screen_end = self.current_facility['screen_end']
+        if screen_start[0] == screen_end[0]:
+            width = abs(screen_end[2] - screen_start[2]) + 1
         else:
-            if current_black_tile_pos is None:
-                for c in range(4):
-                    if c == new_black_tile_pos:
-                        self.displayer_tile_update(row, c, 'black')
-                    else:
-                        self.displayer_tile_update(row, c, 'white')
-            else:
-                if current_black_tile_pos == new_black_tile_pos:
-                    return
-                self.displayer_tile_update(row, current_black_tile_pos, 'white')
-                self.displayer_tile_update(row, new_black_tile_pos, 'black')
+            width = abs(screen_end[0] - screen_start[0]) + 1
+        return int(width), int(screen_end[1] - screen_start[1] + 1)
 
-    def displayer_tile_update(self, row: int, column: int, color: str):
+    def get_tile_world_pos(self, row: int, column: int) -> Optional[tuple]:
         if self.current_facility['screen_start'][0] == self.current_facility['screen_end'][0]:
             if self.current_facility['screen_start'][2] > self.current_facility['screen_end'][2]:
                 adjust = -1
             else:
                 adjust = 1
-            block_pos = (self.current_facility['screen_start'][0],
-                         self.current_facility['screen_start'][1] + row,
-                         self.current_facility['screen_start'][2] + column * adjust)
+            return (self.current_facility['screen_start'][0],
+                    self.current_facility['screen_start'][1] + row,
+                    self.current_facility['screen_start'][2] + column * adjust)
         elif self.current_facility['screen_start'][2] == self.current_facility['screen_end'][2]:
             if self.current_facility['screen_start'][0] > self.current_facility['screen_end'][0]:
                 adjust = -1
             else:
                 adjust = 1
-            block_pos = (self.current_facility['screen_start'][0] + column * adjust,
-                         self.current_facility['screen_start'][1] + row,
-                         self.current_facility['screen_start'][2])
+            return (self.current_facility['screen_start'][0] + column * adjust,
+                    self.current_facility['screen_start'][1] + row,
+                    self.current_facility['screen_start'][2])
         else:
             self.logger.error('[ARC DTWT]An error occurred while updating screen, please recreate game facility.')
-            return
-        # self.server.dispatch_command(self.server.command_sender, f'fill {' '.join([str(_) for _ in block_pos])} {' '.join([str(_) for _ in block_pos])} {color}_wool')
-        self.server.dispatch_command(self.server.command_sender, self.get_fill_command(block_pos, block_pos, f'{color}_wool'))
+            return None
 
     def convert_world_pos_to_screen_pos(self, world_pos: tuple[float, float, float]):
         if self.current_facility['screen_start'][0] == self.current_facility['screen_end'][0]:
@@ -430,48 +873,21 @@ class ARCDTWTPlugin(Plugin):
             return None
 
     # Player record
-    def update_player_record(self, xuid: str, player_name: str, time: float) -> tuple[bool, bool]:
+    def update_player_record(self, xuid: str, player_name: str, time: float, raw_time: Optional[float] = None) -> tuple[bool, bool]:
         """
         更新玩家记录
         :param xuid: 玩家的XUID
         :param player_name: 玩家名称
-        :param time: 完成用时
+        :param time: 扣除服务器延迟后的完成用时，用于排名
+        :param raw_time: 原始完成用时，为None时与time相同
         :return: (是否更新成功, 是否破纪录)
         """
-        today = date.today().isoformat()
-        
-        # 查询现有记录
-        existing_record = self.db_manager.query_one(
-            "SELECT * FROM player_records WHERE xuid = ?",
-            (xuid,)
-        )
-
-        if existing_record is None:
-            # 玩家不存在，插入新记录
-            success = self.db_manager.insert("player_records", {
-                "xuid": xuid,
-                "player_name": player_name,
-                "best_record": time,
-                "last_play_date": today
-            })
-            return success, True  # 新玩家，算作破纪录
-        else:
-            # 更新最后游戏日期
-            update_data = {"player_name": player_name, "last_play_date": today}
-            is_new_record = False
-            
-            if time < existing_record["best_record"]:
-                # 新记录更好，更新记录
-                update_data["best_record"] = time
-                is_new_record = True
-            
-            success = self.db_manager.update(
-                "player_records",
-                update_data,
-                "xuid = ?",
-                (xuid,)
-            )
-            return success, is_new_record
+        if raw_time is None:
+            raw_time = time
+        success, is_new_record = self.storage.update_player_record(xuid, player_name, time, raw_time, date.today().isoformat())
+        if is_new_record:
+            self.invalidate_leaderboard_cache()
+        return success, is_new_record
 
     def get_player_best_time(self, xuid: str) -> Optional[float]:
         """
@@ -479,11 +895,8 @@ class ARCDTWTPlugin(Plugin):
         :param xuid: 玩家XUID
         :return: 玩家最佳用时，如果玩家不存在返回None
         """
-        result = self.db_manager.query_one(
-            "SELECT best_record FROM player_records WHERE xuid = ?",
-            (xuid,)
-        )
-        return result["best_record"] if result else None
+        record = self.storage.get_player_record(xuid)
+        return record.best_record if record is not None else None
 
     def get_player_rank(self, xuid: str) -> Optional[int]:
         """
@@ -491,18 +904,12 @@ class ARCDTWTPlugin(Plugin):
         :param xuid: 玩家XUID
         :return: 玩家排名（从1开始），未找到返回None
         """
-        sql = """
-        WITH RankedPlayers AS (
-            SELECT xuid, 
-                   ROW_NUMBER() OVER (ORDER BY best_record ASC) as rank
-            FROM player_records
-        )
-        SELECT rank
-        FROM RankedPlayers
-        WHERE xuid = ?
-        """
-        result = self.db_manager.query_one(sql, (xuid,))
-        return result["rank"] if result else None
+        return self.storage.get_player_rank(xuid)
+
+    def invalidate_leaderboard_cache(self):
+        """丢弃排行榜缓存，只在主线程调用"""
+        self.leaderboard_cache = None
+        self.leaderboard_generation += 1
 
     def get_leaderboard(self, limit: int, reverse: bool = False) -> List[Tuple[str, float]]:
         """
@@ -511,24 +918,19 @@ class ARCDTWTPlugin(Plugin):
         :param reverse: 是否倒序（获取最慢记录）
         :return: [(玩家名, 用时)] 的列表
         """
-        order = "DESC" if reverse else "ASC"
-        sql = f"""
-        SELECT player_name, best_record
-        FROM player_records
-        ORDER BY best_record {order}
-        LIMIT ?
-        """
-        results = self.db_manager.query_all(sql, (limit,))
-        return [(record["player_name"], record["best_record"]) for record in results]
+        if not reverse and self.leaderboard_cache is not None and limit <= LEADERBOARD_CACHE_SIZE:
+            return self.leaderboard_cache[:limit]
+        if not reverse and limit <= LEADERBOARD_CACHE_SIZE:
+            self.leaderboard_cache = self.storage.get_leaderboard(LEADERBOARD_CACHE_SIZE)
+            return self.leaderboard_cache[:limit]
+        return self.storage.get_leaderboard(limit, reverse)
 
     def get_average_time(self) -> Optional[float]:
         """
         获取所有玩家的平均用时
         :return: 平均用时，无记录返回None
         """
-        sql = "SELECT AVG(best_record) as avg_time FROM player_records"
-        result = self.db_manager.query_one(sql)
-        return result["avg_time"] if result else None
+        return self.storage.get_average_time()
 
     def can_receive_daily_reward(self, xuid: str) -> bool:
         """
@@ -536,25 +938,16 @@ class ARCDTWTPlugin(Plugin):
         :param xuid: 玩家XUID
         :return: 是否可以获得每日奖励
         """
-        today = date.today().isoformat()
-        
-        result = self.db_manager.query_one(
-            "SELECT last_play_date FROM player_records WHERE xuid = ?",
-            (xuid,)
-        )
-        
-        if result is None:
-            return True  # 新玩家，可以获得奖励
-        
-        last_play_date = result.get("last_play_date")
-        return last_play_date != today  # 如果不是今天玩的，可以获得奖励
+        # 新玩家没有记录，可以获得奖励；如果不是今天玩的，可以获得奖励
+        return self.storage.get_last_play_date(xuid) != date.today().isoformat()
 
-    def give_money_to_player(self, player: Player, amount: int, reason: str) -> bool:
+    def give_money_to_player(self, player: Player, amount: int, reason: str, message: Optional[str] = None) -> bool:
         """
         给玩家金钱奖励
         :param player: 玩家对象
         :param amount: 金钱数量
         :param reason: 奖励原因
+        :param message: 发放成功后发送给玩家的消息，为None时按奖励原因选择
         :return: 是否成功
         """
         if self.economy_plugin is None:
@@ -566,7 +959,9 @@ class ARCDTWTPlugin(Plugin):
             self.economy_plugin.api_change_player_money(player.name, amount)
             
             # 根据奖励类型发送不同的消息
-            if "每日" in reason:
+            if message is not None:
+                player.send_message(message)
+            elif "每日" in reason:
                 player.send_message(self.language_manager.GetText('DTWT_DAILY_REWARD_MESSAGE').format(amount))
             elif reason.isdigit():
                 # reason 是排名数字，比如 "1", "2", "3"
@@ -590,6 +985,143 @@ class ARCDTWTPlugin(Plugin):
         elif new_rank == 3:
             self.give_money_to_player(player, self.third_place_reward, str(new_rank))
 
+    # Season
+    def close_season(self, sender: CommandSender) -> None:
+        """
+        结束当前赛季：旧赛季记录改名保留，前几名的奖励记为待领取，在线玩家立即发放
+        :param sender: 命令发送者
+        """
+        if self.if_in_game:
+            sender.send_message(f'[ARC DTWT]A game is in progress, close the season after it ends.')
+            return
+        top = self.get_leaderboard(1)
+        season_id = self.storage.close_season(self.season_rewards, date.today().isoformat())
+        if season_id is None:
+            sender.send_message(f'[ARC DTWT]Failed to close the season, see console for details.')
+            return
+        self.invalidate_leaderboard_cache()
+        # Breakers of the ended season don't belong under the new season's top N
+        self.leaderboard_display.clear_recent_breakers()
+        self.refresh_leaderboard()
+        self.server.broadcast_message(self.language_manager.GetText('DTWT_SEASON_CLOSED_BROADCAST').format(
+            season_id, top[0][0] if top else '-', self.storage.get_current_season()))
+        for player in self.server.online_players:
+            self.pay_season_rewards(player)
+        self.logger.info(f'[ARC DTWT]Season {season_id} closed by {sender.name}.')
+
+    def pay_season_rewards(self, player: Player) -> None:
+        """
+        发放玩家待领取的赛季奖励，每笔发放成功后才删除，失败的奖励保留到下次进服
+        :param player: 玩家对象
+        """
+        if self.economy_plugin is None:
+            return
+        for reward_id, season_id, rank, amount in self.storage.get_season_rewards(player.xuid):
+            if not self.give_money_to_player(player, amount, f'赛季{season_id}',
+                                             self.language_manager.GetText('DTWT_SEASON_REWARD_MESSAGE').format(season_id, rank, amount)):
+                return
+            if not self.storage.complete_season_reward(reward_id):
+                self.logger.warning(f'[ARC DTWT]Season {season_id} reward of {player.name} was paid but could not be removed, it may be paid again.')
+
+    def show_alltime_standings(self, sender: Player) -> None:
+        """
+        向玩家展示历代排行榜与其历代最佳纪录
+        :param sender: 玩家对象
+        """
+        top = self.storage.get_alltime_leaderboard(3)
+        top_lines = ['null-∞' if len(top) <= i else f'{top[i][0]}-{round(top[i][1], 3)}' for i in range(3)]
+        record = self.storage.get_alltime_record(sender.xuid)
+        best_time = round(record.best_record, 3) if record is not None else '∞'
+        rank = self.storage.get_alltime_rank(sender.xuid) if record is not None else None
+        sender.send_message(self.language_manager.GetText('DTWT_ALLTIME_DESCRIPTION').replace('\\n', '\n').format(
+            *top_lines, best_time, rank if rank is not None else '∞'))
+
+    # Statistics
+    def ensure_statistics_scope(self) -> bool:
+        """
+        让统计维度跟随当前设施、赛季与日期，赛季未知时保留原维度且不记录本局
+        :return: 是否存在游戏设施
+        """
+        if self.current_facility is None:
+            return False
+        facility_key = ','.join(str(_) for _ in self.current_facility['screen_start'])
+        self.statistics_manager.ensure_scope(self.storage, facility_key, self.storage.get_current_season(), date.today().isoformat())
+        return True
+
+    def show_statistics(self, sender: Player, best_time: Optional[float]) -> None:
+        """
+        向玩家展示本设施的统计与其最佳纪录在用时分布中的位置
+        :param sender: 玩家对象
+        :param best_time: 玩家本赛季最佳用时
+        """
+        if not self.ensure_statistics_scope():
+            return
+        lines = []
+        for period, name_key in ((PERIOD_DAY, 'DTWT_STATISTICS_TODAY'), (PERIOD_SEASON, 'DTWT_STATISTICS_SEASON'), (PERIOD_ALL, 'DTWT_STATISTICS_ALL')):
+            stats = self.statistics_manager.get(period)
+            if stats is None or stats.runs == 0:
+                continue
+            quantiles = [stats.sketch.quantile(q) for q in (0.5, 0.9, 0.99)]
+            lines.append(self.language_manager.GetText('DTWT_STATISTICS_LINE').format(
+                self.language_manager.GetText(name_key), stats.wins, stats.losses, stats.timeouts,
+                *['-' if _ is None else round(_, 2) for _ in quantiles]))
+        if not lines:
+            return
+        season_stats = self.statistics_manager.get(PERIOD_SEASON)
+        if best_time is not None and season_stats is not None and season_stats.sketch.count > 0:
+            lines.append(self.language_manager.GetText('DTWT_STATISTICS_PLAYER_POSITION').format(round(season_stats.sketch.rank(best_time) * 100, 1)))
+        sender.send_message('\n'.join(lines))
+
+    # Public API
+    def api_get_leaderboard(self, limit: int = LEADERBOARD_CACHE_SIZE) -> List[Tuple[str, float]]:
+        """
+        供其他插件调用：获取排行榜快照，可在任意线程（包括事件回调线程）调用
+        读取主线程发布的前十名快照，不访问也不写入排行榜缓存；插件启动完成前返回空列表
+        :param limit: 获取数量，最多 LEADERBOARD_CACHE_SIZE
+        :return: [(玩家名, 用时)] 的列表
+        """
+        snapshot = self.top_snapshot
+        return list(snapshot[:limit]) if snapshot is not None else []
+
+    def api_get_player_stats(self, xuid: str) -> Optional[Dict[str, Any]]:
+        """
+        供其他插件调用：获取玩家数据，可在任意线程调用
+        使用玩家缓存时直接读取被包装的存储后端（各后端均可跨线程读取），不读取也不填充玩家缓存
+        :param xuid: 玩家XUID
+        :return: {'player_name', 'best_time', 'best_raw_time', 'rank', 'last_play_date'}，无记录返回None
+        """
+        # The player cache is filled by the main thread only
+        storage = self.storage.backend if isinstance(self.storage, CachedStorage) else self.storage
+        record = storage.get_player_record(xuid)
+        if record is None:
+            return None
+        return {
+            'player_name': record.player_name,
+            'best_time': record.best_record,
+            'best_raw_time': record.best_raw_record,
+            'rank': storage.get_player_rank(xuid),
+            'last_play_date': record.last_play_date
+        }
+
+    def api_subscribe(self, event: str, callback) -> bool:
+        """
+        供其他插件调用：订阅事件（game_started / game_ended / personal_best / top_changed）
+        回调在tick结束后于后台线程批量调用，参数为该事件的负载列表
+        :param event: 事件名
+        :param callback: 回调函数
+        :return: 是否订阅成功
+        """
+        return self.event_manager.subscribe(event, callback)
+
+    def api_unsubscribe(self, event: str, callback) -> bool:
+        """
+        供其他插件调用：取消订阅
+        :param event: 事件名
+        :param callback: 订阅时传入的回调函数
+        :return: 是否取消成功
+        """
+        return self.event_manager.unsubscribe(event, callback)
+
     # Static function tools
     @staticmethod
     def judge_if_number_in_range(range_a, range_b, number) -> bool:
@@ -599,31 +1131,7 @@ class ARCDTWTPlugin(Plugin):
     def get_fill_command(pos1: tuple, pos2: tuple, block_name: str) -> str:
         return f'fill {' '.join([str(_) for _ in pos1])} {' '.join([str(_) for _ in pos2])} {block_name}'
 
-    # Database
-    def _init_database(self):
-        """初始化数据库表结构"""
-        # 游戏设施信息表
-        self.db_manager.create_table("game_facilities", {
-            "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
-            "screen_start_x": "INTEGER NOT NULL",
-            "screen_start_y": "INTEGER NOT NULL",
-            "screen_start_z": "INTEGER NOT NULL",
-            "screen_end_x": "INTEGER NOT NULL",
-            "screen_end_y": "INTEGER NOT NULL",
-            "screen_end_z": "INTEGER NOT NULL",
-            "trigger_x": "INTEGER NOT NULL",
-            "trigger_y": "INTEGER NOT NULL",
-            "trigger_z": "INTEGER NOT NULL"
-        })
-
-        # 玩家记录表
-        self.db_manager.create_table("player_records", {
-            "xuid": "TEXT PRIMARY KEY",
-            "player_name": "TEXT NOT NULL",
-            "best_record": "REAL NOT NULL",
-            "last_play_date": "TEXT"
-        })
-
+    # Facility
     def update_game_facility(self, screen_start: tuple, screen_end: tuple, trigger_pos: tuple) -> bool:
         """
         更新游戏设施信息
@@ -632,21 +1140,7 @@ class ARCDTWTPlugin(Plugin):
         :param trigger_pos: 触发方块坐标 (x, y, z)
         :return: 是否更新成功
         """
-        # 首先删除所有现有记录
-        self.db_manager.execute("DELETE FROM game_facilities")
-
-        # 插入新记录
-        return self.db_manager.insert("game_facilities", {
-            "screen_start_x": screen_start[0],
-            "screen_start_y": screen_start[1],
-            "screen_start_z": screen_start[2],
-            "screen_end_x": screen_end[0],
-            "screen_end_y": screen_end[1],
-            "screen_end_z": screen_end[2],
-            "trigger_x": trigger_pos[0],
-            "trigger_y": trigger_pos[1],
-            "trigger_z": trigger_pos[2]
-        })
+        return self.storage.save_facility(screen_start, screen_end, trigger_pos)
 
     def get_game_facility(self) -> Optional[Dict[str, Any]]:
         """
@@ -659,25 +1153,4 @@ class ARCDTWTPlugin(Plugin):
             'trigger_pos': tuple(x, y, z)
         }
         """
-        result = self.db_manager.query_one("SELECT * FROM game_facilities LIMIT 1")
-
-        if result is None:
-            return None
-
-        return {
-            'screen_start': (
-                result['screen_start_x'],
-                result['screen_start_y'],
-                result['screen_start_z']
-            ),
-            'screen_end': (
-                result['screen_end_x'],
-                result['screen_end_y'],
-                result['screen_end_z']
-            ),
-            'trigger_pos': (
-                result['trigger_x'],
-                result['trigger_y'],
-                result['trigger_z']
-            )
-        }
\ No newline at end of file
+        return self.storage.load_facility()
@@ -0,0 +1,83 @@
+"""
+CachedStorage consistency when another thread reads while the main thread writes.
+
+Run from the repository root, endstone is not needed:
+    python -m unittest discover -s tests
+"""
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from endstone_arc_dtwt.CachedStorage import CachedStorage
+from endstone_arc_dtwt.MemoryStorage import MemoryStorage
+
+TODAY = '2024-06-01'
+
+
+class SlowReadStorage(MemoryStorage):
+    """Holds the first read of a chosen thread after the row was read, until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.slow_thread = None
+        self.row_read = threading.Event()
+        self.release = threading.Event()
+
+    def get_player_record(self, xuid):
+        record = super().get_player_record(xuid)
+        if threading.current_thread() is self.slow_thread:
+            self.slow_thread = None
+            self.row_read.set()
+            self.release.wait(5)
+        return record
+
+
+class CachedStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = SlowReadStorage()
+        self.storage = CachedStorage(self.backend)
+        self.storage.init()
+
+    def read_in_background(self, xuid):
+        reader = threading.Thread(target=self.storage.get_player_record, args=(xuid,))
+        self.backend.slow_thread = reader
+        reader.start()
+        self.assertTrue(self.backend.row_read.wait(5))
+        return reader
+
+    def test_stale_miss_does_not_overwrite_newer_write(self):
+        self.storage.update_player_record('x1', 'alice', 20.0, 20.0, TODAY)
+        self.storage.invalidate('x1')
+        # Another thread misses and reads best 20, the main thread saves best 15 before it stores the row
+        reader = self.read_in_background('x1')
+        self.assertEqual(self.storage.update_player_record('x1', 'alice', 15.0, 15.0, TODAY), (True, True))
+        self.backend.release.set()
+        reader.join()
+
+        self.assertEqual(self.storage.get_player_record('x1').best_record, 15.0)
+        # A slower run is not a new record and keeps the stored best
+        self.assertEqual(self.storage.update_player_record('x1', 'alice', 18.0, 18.0, TODAY), (True, False))
+        self.assertEqual(self.backend.get_player_record('x1').best_record, 15.0)
+
+    def test_stale_miss_does_not_survive_full_invalidation(self):
+        reader = self.read_in_background('x1')
+        self.backend.update_player_record('x1', 'alice', 12.0, 12.0, TODAY)
+        self.storage.invalidate()
+        self.backend.release.set()
+        reader.join()
+
+        self.assertEqual(self.storage.get_player_record('x1').best_record, 12.0)
+
+    def test_miss_is_cached_when_nothing_was_written(self):
+        self.backend.update_player_record('x1', 'alice', 20.0, 20.0, TODAY)
+        self.storage.get_player_record('x1')
+        self.backend.update_player_record('x1', 'alice', 10.0, 10.0, TODAY)
+        # Served from the cache, the backend change is not seen
+        self.assertEqual(self.storage.get_player_record('x1').best_record, 20.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+SharedStorageClient / SharedStorageServer round trips against a local in-memory server.
+
+Run from the repository root, endstone is not needed:
+    python -m unittest discover -s tests
+"""
+import socket
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from endstone_arc_dtwt.MemoryStorage import MemoryStorage
+from endstone_arc_dtwt.RecordTypes import PlayerRecord
+from endstone_arc_dtwt.RunStatistics import RunStatistics
+from endstone_arc_dtwt.SharedStorage import SHARED_OPERATIONS, SharedStorageClient, SharedStorageServer
+
+TODAY = '2024-06-01'
+
+
+class SharedStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MemoryStorage()
+        self.backend.init()
+        self.server = SharedStorageServer(('127.0.0.1', 0), self.backend)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.client_a = self.make_client()
+        self.client_b = self.make_client()
+
+    def tearDown(self):
+        self.client_a.close()
+        self.client_b.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_client(self) -> SharedStorageClient:
+        client = SharedStorageClient(self.server.server_address, MemoryStorage(), timeout=5.0)
+        client.init()
+        return client
+
+    def test_every_operation_round_trips(self):
+        a, b = self.client_a, self.client_b
+        checked = set()
+
+        def check(op, value, expected):
+            self.assertEqual(value, expected, op)
+            checked.add(op)
+
+        check('update_player_record', a.update_player_record('x1', 'alice', 12.5, 13.0, TODAY), (True, True))
+        check('save_player_record', a.save_player_record(PlayerRecord('x2', 'bob', 20.0, TODAY, 20.5),
+                                                         PlayerRecord('x2', 'bob', 20.0, TODAY, 20.5)), True)
+        check('import_player_records', a.import_player_records([PlayerRecord('x3', 'carol', 30.0, '2024-01-01', 30.0)]), True)
+
+        record = b.get_player_record('x1')
+        check('get_player_record', (record.player_name, record.best_record, record.best_raw_record), ('alice', 12.5, 13.0))
+        check('get_player_rank', b.get_player_rank('x2'), 2)
+        check('get_leaderboard', b.get_leaderboard(2), [('alice', 12.5), ('bob', 20.0)])
+        self.assertEqual(b.get_leaderboard(1, True), [('carol', 30.0)])
+        check('get_average_time', round(b.get_average_time(), 6), round((12.5 + 20.0 + 30.0) / 3, 6))
+        check('get_last_play_date', b.get_last_play_date('x1'), TODAY)
+        check('restore_player', b.restore_player('x1'), False)
+        # Maintenance runs in the server process, the client call is a local no-op
+        check('run_maintenance_slice', b.run_maintenance_slice(), 0)
+
+        stats = RunStatistics()
+        stats.record(True, 12.5)
+        stats.record(False, timeout=True)
+        merged = a.merge_run_statistics({'facility|all': stats})
+        check('merge_run_statistics', (merged['facility|all'].wins, merged['facility|all'].timeouts), (1, 1))
+        loaded = b.load_run_statistics(['facility|all', 'missing'])
+        check('load_run_statistics', (list(loaded), loaded['facility|all'].sketch.count), (['facility|all'], 1))
+
+        check('get_current_season', a.get_current_season(), 1)
+        check('close_season', a.close_season([100, 50], TODAY), 1)
+        self.assertEqual(b.get_current_season(), 2)
+        check('get_season_leaderboard', b.get_season_leaderboard(1, 10), [('alice', 12.5), ('bob', 20.0), ('carol', 30.0)])
+        rewards = b.get_season_rewards('x1')
+        check('get_season_rewards', [reward[1:] for reward in rewards], [(1, 1, 100)])
+        # A reward stays pending until it is completed after a successful payout
+        self.assertEqual(a.get_season_rewards('x1'), rewards)
+        check('complete_season_reward', a.complete_season_reward(rewards[0][0]), True)
+        self.assertEqual(b.get_season_rewards('x1'), [])
+        # Last play date survives the rotation, the daily reward is not paid twice
+        self.assertEqual(b.get_last_play_date('x1'), TODAY)
+
+        check('get_alltime_record', b.get_alltime_record('x1').best_record, 12.5)
+        check('get_alltime_rank', b.get_alltime_rank('x2'), 2)
+        check('get_alltime_leaderboard', b.get_alltime_leaderboard(2), [('alice', 12.5), ('bob', 20.0)])
+        # Imported players are part of the all-time ranking too
+        self.assertEqual(b.get_alltime_rank('x3'), 3)
+
+        self.assertEqual(checked, set(SHARED_OPERATIONS))
+
+    def test_concurrent_writes_from_two_clients(self):
+        rounds = 50
+        barrier = threading.Barrier(2)
+
+        def play(client, offset):
+            barrier.wait()
+            for i in range(rounds):
+                client.update_player_record('x1', 'alice', 100.0 - i - offset, 100.0, TODAY)
+                delta = RunStatistics()
+                delta.record(True, 10.0 + i)
+                client.merge_run_statistics({'facility|all': delta})
+
+        threads = [threading.Thread(target=play, args=(client, offset))
+                   for client, offset in ((self.client_a, 0.0), (self.client_b, 0.5))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.backend.get_player_record('x1').best_record, 100.0 - (rounds - 1) - 0.5)
+        stats = self.backend.load_run_statistics(['facility|all'])['facility|all']
+        self.assertEqual((stats.wins, stats.sketch.count), (rounds * 2, rounds * 2))
+
+    def test_facility_stays_local(self):
+        self.assertTrue(self.client_a.save_facility((0, 64, 0), (3, 68, 0), (5, 64, 0)))
+        self.assertEqual(self.client_a.load_facility()['screen_end'], (3, 68, 0))
+        self.assertIsNone(self.client_b.load_facility())
+        self.assertIsNone(self.backend.load_facility())
+
+    def test_unreachable_server_fails_fast(self):
+        # A port nothing listens on
+        probe = socket.socket()
+        probe.bind(('127.0.0.1', 0))
+        address = probe.getsockname()
+        probe.close()
+        client = SharedStorageClient(address, MemoryStorage(), timeout=0.5)
+        self.assertEqual(client.get_leaderboard(3), [])
+        # Inside the backoff window calls return the default without touching the network
+        self.assertGreater(client.retry_after, 0)
+        self.assertEqual(client.update_player_record('x1', 'alice', 1.0, 1.0, TODAY), (False, False))
+        self.assertIsNone(client.sock)
+        client.close()
+
+
+class SharedStorageServerAddressTest(unittest.TestCase):
+    def test_refuses_non_loopback_address(self):
+        for host in ('0.0.0.0', ''):
+            with self.assertRaises(ValueError):
+                SharedStorageServer((host, 0), MemoryStorage())
+
+    def test_allows_localhost(self):
+        server = SharedStorageServer(('localhost', 0), MemoryStorage())
+        server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()